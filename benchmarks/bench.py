@@ -0,0 +1,276 @@
+"""Micro and macro benchmarks of the training hot path.
+
+Run from the repository root:
+    python -m benchmarks.bench                      # print results
+    python -m benchmarks.bench -o results.json      # save results
+    python -m benchmarks.bench --save-baseline      # update baseline
+    python -m benchmarks.bench --compare            # check regressions
+
+Every benchmark seeds `random`, numpy and torch before running, and
+reports the best mean time per call over several repeats.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import numpy as np
+import torch
+from srcs.agent.Interpreter import Interpreter
+from srcs.agent.Memory import Memory
+from srcs.agent.SnakeAgent import SnakeAgent
+from srcs.game.Board import Board
+from srcs.game.GameConfig import GameConfig
+from srcs.game.Snake import Snake
+from srcs.game.SnakeEnv import SnakeEnv
+from srcs.game.Spawner import Spawner
+from srcs.game.VecSnakeEnv import VecSnakeEnv
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCHMARKS = {}
+SEED = 42
+
+
+def benchmark(name: str):
+    """Register a benchmark returning (function, calls per run)."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def seed_all() -> None:
+    random.seed(SEED)
+    np.random.seed(SEED)
+    torch.manual_seed(SEED)
+
+
+def measure(function, calls: int, repeat: int) -> float:
+    """Return best mean time per call in microseconds."""
+    function()  # warm up
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best * 1e6
+
+
+def make_game(grid_size: int, length: int) -> tuple[Snake, list, list, Board]:
+    """Build a board with a serpentine snake of `length` and 3 fruits."""
+    board = Board(grid_size)
+    path = [[y, x if y % 2 == 0 else grid_size - 1 - x]
+            for y in range(grid_size) for x in range(grid_size)]
+    snake = Snake(board, path[:length][::-1])
+    fruits = []
+    for kind in (Board.GREEN, Board.GREEN, Board.RED):
+        fruit = board.random_free_cell()
+        board.add_fruit(*fruit, kind)
+        fruits.append(fruit)
+    return snake, fruits[:2], fruits[2:], board
+
+
+def register_board_benchmarks() -> None:
+    for grid_size, length in ((10, 3), (10, 50), (30, 3), (30, 450),
+                              (100, 3), (100, 5000)):
+        suffix = f"g{grid_size}_l{length}"
+
+        @benchmark(f"get_state_{suffix}")
+        def get_state(grid_size=grid_size, length=length):
+            snake, green, red, board = make_game(grid_size, length)
+            interpreter = Interpreter()
+            return (lambda: interpreter.get_state(snake, green, red, board),
+                    200)
+
+        @benchmark(f"get_reward_{suffix}")
+        def get_reward(grid_size=grid_size, length=length):
+            snake, green, red, board = make_game(grid_size, length)
+            head = snake.head
+            interpreter = Interpreter()
+            return (lambda: interpreter.get_reward(head, snake, green, red,
+                                                   board),
+                    1000)
+
+        @benchmark(f"fruit_spawn_{suffix}")
+        def fruit_spawn(grid_size=grid_size, length=length):
+            board = make_game(grid_size, length)[3]
+            return lambda: Spawner.fruit_spawn(board), 1000
+
+
+register_board_benchmarks()
+
+for grid_size, snake_size in ((10, 3), (10, 10), (100, 100)):
+    benchmark(f"snake_spawn_g{grid_size}_s{snake_size}")(
+        lambda grid_size=grid_size, snake_size=snake_size:
+        (lambda: Spawner.snake_spawn(snake_size, grid_size), 1000))
+
+
+@benchmark("memory_push")
+def memory_push():
+    memory = Memory(100_000, torch.device("cpu"))
+    state = np.random.random(20).astype(np.float32).tolist()
+    return lambda: memory.push(state, 1, 0.0, state, False), 2000
+
+
+@benchmark("memory_sample_1000")
+def memory_sample():
+    memory = Memory(100_000, torch.device("cpu"))
+    states = np.random.random((100_000, 20)).astype(np.float32)
+    memory.push_batch(states, np.zeros(100_000, dtype=np.int64),
+                      np.zeros(100_000), states, np.zeros(100_000))
+    return lambda: memory.sample(1000), 100
+
+
+@benchmark("forward_batch_1")
+def forward_one():
+    agent = SnakeAgent(training=False)
+    state = np.random.random(20).astype(np.float32).tolist()
+    return lambda: agent.get_action(state, False), 500
+
+
+@benchmark("forward_batch_256")
+def forward_batch():
+    agent = SnakeAgent(training=False)
+    states = np.random.random((256, 20)).astype(np.float32)
+    return lambda: agent.get_actions(states), 100
+
+
+@benchmark("learn")
+def learn():
+    agent = SnakeAgent(training=True)
+    states = np.random.random((10_000, 20)).astype(np.float32)
+    agent.memory.push_batch(states, np.random.randint(0, 4, 10_000),
+                            np.random.random(10_000), states,
+                            np.zeros(10_000))
+    return agent.learn, 10
+
+
+@benchmark("episode_headless")
+def episode_headless():
+    env = SnakeEnv(seed=SEED)
+    rng = random.Random(SEED)
+
+    def play():
+        state, done = env.reset(), False
+        while not done:
+            safe = [a for a in range(4) if not state[16 + a]] or [0]
+            state, _, done, _ = env.step(rng.choice(safe))
+    return play, 20
+
+
+@benchmark("vec_env_step_256")
+def vec_env_step(config: GameConfig | None = None):
+    env = VecSnakeEnv(256, seed=SEED, config=config)
+    env.reset()
+    actions = np.random.randint(0, 4, size=(64, 256))
+    step = iter(range(10**9))
+    return lambda: env.step(actions[next(step) % 64]), 100
+
+
+for grid_size in (40, 100):
+    benchmark(f"vec_env_step_256_g{grid_size}")(
+        lambda grid_size=grid_size: vec_env_step(GameConfig(grid_size)))
+
+
+def run(names: list[str], repeat: int) -> dict:
+    """Run benchmarks and return their results."""
+    results = {}
+    for name in names:
+        seed_all()
+        function, calls = BENCHMARKS[name]()
+        results[name] = {"us_per_call": round(measure(function, calls,
+                                                      repeat), 3)}
+        print(f"{name:<28} {results[name]['us_per_call']:>12.2f} us")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print ratios to baseline and return names slower than threshold.
+
+    Benchmarks missing from the baseline are listed as such, a baseline
+    recorded before they were added must be regenerated.
+    """
+    regressions = []
+    missing = []
+    print(f"\n{'benchmark':<28} {'baseline':>12} {'current':>12} ratio")
+    for name, result in results.items():
+        if name not in baseline:
+            missing.append(name)
+            print(f"{name:<28} {'-':>12} {result['us_per_call']:>12.2f}"
+                  f"   no baseline")
+            continue
+        before = baseline[name]["us_per_call"]
+        ratio = result["us_per_call"] / before
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<28} {before:>12.2f} {result['us_per_call']:>12.2f} "
+              f"{ratio:5.2f}{flag}")
+    if missing:
+        print(f"\n{len(missing)} benchmark(s) without baseline: "
+              f"{', '.join(missing)}")
+    return regressions
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output",
+                        type=str, default=None,
+                        help="JSON file to write results to.")
+    parser.add_argument("-k", "--filter",
+                        type=str, default="",
+                        help="Only run benchmarks containing this text.")
+    parser.add_argument("-r", "--repeat",
+                        type=int, default=5,
+                        help="Runs per benchmark, best one is kept.")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare against the stored baseline.")
+    parser.add_argument("--baseline",
+                        type=str, default=BASELINE,
+                        help="Baseline JSON file.")
+    parser.add_argument("--threshold",
+                        type=float, default=0.2,
+                        help="Allowed slowdown ratio before failing.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write results as the new baseline.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    torch.set_num_threads(1)
+    names = [name for name in BENCHMARKS if args.filter in name]
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "torch": torch.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": run(names, args.repeat),
+    }
+
+    for path in filter(None, (args.output,
+                              args.baseline if args.save_baseline else None)):
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to '{path}'")
+
+    if args.compare:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over "
+                  f"{args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Episodes and wall time for each learner to reach a mean length.
+
+Run from the repository root:
+    python -m benchmarks.learner                        # all learners
+    python -m benchmarks.learner -l dqn double_n3 -s 5  # 5 seeds each
+    python -m benchmarks.learner -t 10 -o learners.json
+
+Each run trains a fresh agent on headless episodes, seeded like
+`benchmarks.bench`, until the mean length of the last `window` episodes
+reaches the target, or gives up after `max_episodes`. "dqn" is the
+current learner, other variants only change its targets.
+"""
+import argparse
+import json
+import random
+import time
+import numpy as np
+import torch
+from srcs.agent.SnakeAgent import SnakeAgent
+from srcs.agent.StepRecord import StepRecord
+from srcs.game.EpisodeStats import EpisodeStats
+from srcs.game.SnakeEnv import SnakeEnv
+
+LEARNERS = {
+    "dqn": {},
+    "double": {"double_dqn": True},
+    "n3": {"n_step": 3},
+    "double_n3": {"double_dqn": True, "n_step": 3},
+}
+
+
+def train(learner: str,
+          seed: int,
+          target: float,
+          window: int,
+          max_episodes: int,
+          learn_every: int
+          ) -> dict:
+    """Train one agent until it reaches `target` and return the cost."""
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    env = SnakeEnv(seed=seed)
+    agent = SnakeAgent(training=True, learn_every=learn_every,
+                       **LEARNERS[learner])
+    stats = EpisodeStats(window)
+    env_steps = 0
+    start = time.perf_counter()
+
+    for episode in range(1, max_episodes + 1):
+        record, done = StepRecord(env.reset()), False
+        while not done:
+            action = agent.act(record)
+            next_state, reward, done, _ = env.step(action)
+            agent.update(record.state, action, reward, next_state, done)
+            record = StepRecord(next_state)
+            env_steps += 1
+        stats.add(len(env.snake))
+        if len(stats) >= window and stats.recent_mean() >= target:
+            break
+
+    return {
+        "learner": learner,
+        "seed": seed,
+        "reached": stats.recent_mean() >= target,
+        "episodes": len(stats),
+        "env_steps": env_steps,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Median cost of the runs of each learner."""
+    summary = {}
+    for learner in dict.fromkeys(run["learner"] for run in runs):
+        own = [run for run in runs if run["learner"] == learner]
+        summary[learner] = {
+            "reached": sum(run["reached"] for run in own),
+            "runs": len(own),
+            "episodes": float(np.median([run["episodes"] for run in own])),
+            "env_steps": float(np.median([run["env_steps"] for run in own])),
+            "seconds": float(np.median([run["seconds"] for run in own])),
+        }
+    return summary
+
+
+def print_summary(summary: dict, baseline: str = "dqn") -> None:
+    print(f"\n{'learner':<12} {'reached':>8} {'episodes':>9} "
+          f"{'env steps':>10} {'seconds':>8} {'vs ' + baseline:>9}")
+    reference = summary.get(baseline)
+    for learner, result in summary.items():
+        ratio = (f"{result['seconds'] / reference['seconds']:.2f}x"
+                 if reference else "")
+        print(f"{learner:<12} {result['reached']:>4}/{result['runs']:<3} "
+              f"{result['episodes']:>9.0f} {result['env_steps']:>10.0f} "
+              f"{result['seconds']:>8.1f} {ratio:>9}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-l", "--learners",
+                        nargs="+", choices=list(LEARNERS),
+                        default=list(LEARNERS),
+                        help="Learners to compare.")
+    parser.add_argument("-t", "--target",
+                        type=float, default=8,
+                        help="Mean length to reach.")
+    parser.add_argument("-w", "--window",
+                        type=int, default=100,
+                        help="Episodes of the mean length.")
+    parser.add_argument("-s", "--seeds",
+                        type=int, default=3,
+                        help="Runs per learner, with seeds 0..S-1.")
+    parser.add_argument("-m", "--max-episodes",
+                        type=int, default=5000,
+                        help="Episodes before a run gives up.")
+    parser.add_argument("--learn-every",
+                        type=int, default=1,
+                        help="Environment steps between two learn calls.")
+    parser.add_argument("-o", "--output",
+                        type=str, default=None,
+                        help="JSON file to write runs and summary to.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    runs = []
+    for seed in range(args.seeds):
+        for learner in args.learners:
+            run = train(learner, seed, args.target, args.window,
+                        args.max_episodes, args.learn_every)
+            runs.append(run)
+            print(f"{learner:<12} seed {seed}: {run['episodes']} episodes, "
+                  f"{run['env_steps']} steps, {run['seconds']}s"
+                  + ("" if run["reached"] else " (target not reached)"))
+
+    summary = summarize(runs)
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"target": args.target, "window": args.window,
+                       "runs": runs, "summary": summary}, file, indent=2)
+        print(f"\nResults written to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
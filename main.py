@@ -1,6 +1,12 @@
 from srcs.game.SnakeGame import SnakeGame
+from srcs.game.ParallelTrainer import ParallelTrainer
+from srcs.game.Profiler import Profiler
+from srcs.game.GameConfig import GameConfig
+from srcs.agent.SnakeAgent import SnakeAgent
 from srcs.display.Colors import Colors as Col
-from settings import WIDTH, HEIGHT
+from settings import GRID_SIZE, SNAKE_SIZE, GREEN_FRUITS_NB, \
+                     RED_FRUITS_NB, R_COLLISION, R_GREEN_FRUIT, \
+                     R_RED_FRUIT, R_WIN
 import pygame as pg
 import argparse
 
@@ -20,6 +26,17 @@ def parse_arguments():
     parser.add_argument("-plot",
                         type=str, default=None,
                         help="Filename to save statistics plots.")
+    parser.add_argument("--metrics",
+                        type=str, default=None,
+                        help="CSV file to append per-episode metrics to. "
+                             "Default next to the plot when -plot is set.")
+    parser.add_argument("--profile",
+                        nargs="?", type=str, default=None,
+                        const="profile.json",
+                        help="Time each phase of the game and training "
+                             "loops, print a breakdown with the periodic "
+                             "stats and write it as JSON at exit "
+                             "(default file: profile.json).")
     parser.add_argument("-m", "--model",
                         type=str, default=None,
                         help="Path to a pre-trained model to load.")
@@ -32,13 +49,97 @@ def parse_arguments():
                         help="Enable player mode.")
     parser.add_argument("-d", "--debug", action="store_true",
                         help="Enable debug mode.")
+    parser.add_argument("--actors",
+                        type=int, default=0,
+                        help="Number of actor processes for parallel "
+                             "training. Default 0 (single process).")
+    parser.add_argument("--learn-every",
+                        type=int, default=1,
+                        help="Environment steps between two learn calls.")
+    parser.add_argument("--gradient-steps",
+                        type=int, default=1,
+                        help="Gradient steps run by each learn call.")
+    parser.add_argument("--warmup",
+                        type=int, default=0,
+                        help="Transitions stored before learning starts "
+                             "(at least one batch).")
+    parser.add_argument("--per", action="store_true",
+                        help="Enable prioritized experience replay.")
+    parser.add_argument("--double-dqn", action="store_true",
+                        help="Use Double DQN targets: the online network "
+                             "picks the next action, the target network "
+                             "evaluates it.")
+    parser.add_argument("--n-step",
+                        type=int, default=1,
+                        help="Rewards summed in each target before "
+                             "bootstrapping. Default 1 (one-step).")
+    parser.add_argument("--checkpoint",
+                        type=str, default=None,
+                        help="Directory to save full training checkpoints "
+                             "to, at each autosave and at the end.")
+    parser.add_argument("--resume",
+                        type=str, default=None,
+                        help="Checkpoint directory to resume training "
+                             "from.")
+    parser.add_argument("--render-fps",
+                        type=float, default=0,
+                        help="Refresh the display at most this many times "
+                             "per second, without slowing the game down.")
+    parser.add_argument("--render-every",
+                        type=int, default=1,
+                        help="Only draw every K steps, without slowing the "
+                             "game down.")
+    parser.add_argument("--render-episodes",
+                        type=int, default=1,
+                        help="Only draw every K episodes, without slowing "
+                             "the game down.")
+    parser.add_argument("--grid-size",
+                        type=int, default=GRID_SIZE,
+                        help="Number of cells on each side of the board.")
+    parser.add_argument("--snake-size",
+                        type=int, default=SNAKE_SIZE,
+                        help="Initial snake length.")
+    parser.add_argument("--green-fruits",
+                        type=int, default=GREEN_FRUITS_NB,
+                        help="Number of green fruits on the board.")
+    parser.add_argument("--red-fruits",
+                        type=int, default=RED_FRUITS_NB,
+                        help="Number of red fruits on the board.")
+    parser.add_argument("--rewards",
+                        type=float, nargs=4,
+                        default=(R_COLLISION, R_GREEN_FRUIT,
+                                 R_RED_FRUIT, R_WIN),
+                        metavar=("COLLISION", "GREEN", "RED", "WIN"),
+                        help="Rewards of a collision, a green fruit, a red "
+                             "fruit and a win.")
+    parser.add_argument("--cell-size",
+                        type=int, default=None,
+                        help="Cell side in pixels. Default fits the board "
+                             "in the window.")
 
     return parser.parse_args()
 
 
-def init_pygame():
+def init_pygame(config: GameConfig):
     pg.init()
-    return pg.display.set_mode((WIDTH, HEIGHT))
+    return pg.display.set_mode((config.width, config.height))
+
+
+def check_resume_options(args) -> None:
+    """Check learner options against the checkpoint to resume."""
+    saved = SnakeAgent.checkpoint_learner_options(args.resume)
+    if saved["prioritized"] != args.per:
+        raise ArgError(f"Checkpoint '{args.resume}' was saved "
+                       f"{'with' if saved['prioritized'] else 'without'} "
+                       f"--per, resume it the same way")
+    if saved["n_step"] != args.n_step:
+        raise ArgError(f"Checkpoint '{args.resume}' replay holds "
+                       f"{saved['n_step']}-step returns, resume it with "
+                       f"--n-step {saved['n_step']}")
+    if saved["double_dqn"] != args.double_dqn:
+        raise ArgError(f"Checkpoint '{args.resume}' was saved "
+                       f"{'with' if saved['double_dqn'] else 'without'} "
+                       f"--double-dqn, resume it the same way")
 
 
 def main():
@@ -51,10 +152,43 @@ def main():
             raise ArgError("Can't off visual and play in step-by-step")
         if args.visual == "off" and args.player:
             raise ArgError("Can't off visual and use player commands")
+        if args.learn_every < 1 or args.gradient_steps < 1:
+            raise ArgError("Learn frequency and gradient steps must be > 0")
+        if (args.checkpoint or args.resume) and not args.train:
+            raise ArgError("Checkpoints are only used in training mode")
+        if args.actors and not args.train:
+            raise ArgError("Actors are only used in training mode")
+        if args.actors and args.visual == "on":
+            raise ArgError("Can't train with actors and visual on")
+        if (args.render_fps < 0 or args.render_every < 1
+                or args.render_episodes < 1):
+            raise ArgError("Render fps must be >= 0 and strides > 0")
+        if args.n_step < 1:
+            raise ArgError("N-step must be > 0")
+        if (args.double_dqn or args.n_step > 1) and not args.train:
+            raise ArgError("Double DQN and n-step are training options")
+        if args.visual == "off" and (args.render_fps
+                                     or args.render_every > 1
+                                     or args.render_episodes > 1):
+            raise ArgError("Can't off visual and set a render rate")
+        if args.player and (args.render_fps or args.render_every > 1
+                            or args.render_episodes > 1):
+            raise ArgError("Can't play and set a render rate, player mode "
+                           "runs at FPS")
+        if args.resume:
+            check_resume_options(args)
+        config = GameConfig(grid_size=args.grid_size,
+                            snake_size=args.snake_size,
+                            green_fruits=args.green_fruits,
+                            red_fruits=args.red_fruits,
+                            rewards=tuple(args.rewards),
+                            cell_size=args.cell_size)
+        if args.profile:
+            Profiler.enable()
         if args.visual == "on":
-            surface = init_pygame()
+            surface = init_pygame(config)
             pg.display.set_caption('Learn2Slither')
-        game = SnakeGame(episode=args.episode,
+        game_args = dict(episode=args.episode,
                          visual=args.visual,
                          plot=args.plot,
                          model=args.model,
@@ -62,7 +196,24 @@ def main():
                          step_by_step=args.step_by_step,
                          is_ai_control=not args.player,
                          debug=args.debug,
-                         surface=surface)
+                         surface=surface,
+                         learn_every=args.learn_every,
+                         gradient_steps=args.gradient_steps,
+                         warmup=args.warmup,
+                         prioritized=args.per,
+                         double_dqn=args.double_dqn,
+                         n_step=args.n_step,
+                         checkpoint=args.checkpoint or args.resume,
+                         resume=args.resume,
+                         render_fps=args.render_fps,
+                         render_every=args.render_every,
+                         render_episodes=args.render_episodes,
+                         metrics=args.metrics,
+                         config=config)
+        if args.actors:
+            game = ParallelTrainer(actors=args.actors, **game_args)
+        else:
+            game = SnakeGame(**game_args)
         game.run()
     except AssertionError as e:
         print(f"{Col.RED}{Col.BOLD}{e.__class__.__name__}: {e}{Col.END}")
@@ -73,6 +224,8 @@ def main():
     finally:
         if args is not None and args.visual == "on":
             pg.quit()
+        if args is not None and args.profile:
+            Profiler.save(args.profile)
 
 
 if __name__ == "__main__":
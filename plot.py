@@ -0,0 +1,30 @@
+from srcs.display.Plotter import MetricsReader, plot_metrics
+import argparse
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Plot a metrics log written during training.")
+    parser.add_argument("metrics",
+                        type=str,
+                        help="CSV metrics log (see --metrics of main.py).")
+    parser.add_argument("-o", "--output",
+                        type=str, default="plot/metrics.png",
+                        help="Image file to write.")
+    parser.add_argument("-w", "--window",
+                        type=int, default=20,
+                        help="Episodes of the length moving mean.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    reader = MetricsReader(args.metrics)
+    if not reader.update():
+        raise SystemExit(f"No episode in '{args.metrics}'")
+    plot_metrics(reader, args.output, args.window)
+    print(f"Plot saved: '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
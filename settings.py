@@ -4,6 +4,8 @@ CELL_SIZE = 40
 MARGIN = 100
 MIN_AI_WIDTH = 475
 MIN_GAME_HEIGHT = 600
+# Cells shrink so larger boards fit in this many pixels
+MAX_GAME_SIZE = 800
 
 GAME_SIZE = GRID_SIZE * CELL_SIZE
 HEIGHT = max(MIN_GAME_HEIGHT, MARGIN + GAME_SIZE + MARGIN)
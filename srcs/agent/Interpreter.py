@@ -1,11 +1,29 @@
-from settings import R_COLLISION, R_GREEN_FRUIT, R_RED_FRUIT, GRID_SIZE
+from ..game.Board import Board
+from ..game.GameConfig import GameConfig
 
 
 class Interpreter:
-    @staticmethod
-    def get_state(snake: list[list],
+    """Observation and reward rules of a game.
+
+    Args:
+        `config`: Game configuration (rewards, grid size of boards built
+            from lists), default `GameConfig()`
+
+    Implementation:
+        Wall distances follow from the padded head cell, and each ray is
+        a slice of the padded board from the head up to the wall. Fruits
+        and body are found on each ray with one `bytearray` copy and
+        search, so a state costs O(ray length) in C and a reward O(1),
+        whatever the board area.
+    """
+    def __init__(self, config: GameConfig | None = None):
+        self.config = config or GameConfig()
+
+    def get_state(self,
+                  snake: list[list],
                   green_fruits: list[list],
-                  red_fruits: list[list]
+                  red_fruits: list[list],
+                  board: Board | None = None
                   ) -> list:
         """Returns current game state as input for neural network.
 
@@ -13,6 +31,8 @@ class Interpreter:
             `snake`: Snake coordinates [[y,x], ...]
             `green_fruits`: Green fruit coordinates [[y,x], ...]
             `red_fruits`: Red fruit coordinates [[y,x], ...]
+            `board`: Occupancy grid of the same game, built from the
+                lists if not given
 
         Returns:
             `List` of 20 values [0-1]:
@@ -22,63 +42,70 @@ class Interpreter:
             - [12-15]: Body dist in directions [up,down,left,right]
             - [16-19]: Collision flags [up,down,left,right] (0 or 1)
         """
-        snake_head = snake[0]
-
-        def get_collision_dist(direction: list):
-            """Returns normalized distance [0-1] to wall in given direction."""
-            y, x = snake_head
-            dy, dx = direction
-            distance = 0
-
-            while 0 <= y < GRID_SIZE and 0 <= x < GRID_SIZE:
-                y += dy
-                x += dx
-                distance += 1
-            return distance / GRID_SIZE
+        if board is None:
+            board = Board.from_lists(snake, green_fruits, red_fruits,
+                                     self.config.grid_size)
+        cells, body = board.cells, board.body
+        grid_size, stride = board.grid_size, board.stride
+        head = board.pack(*snake[0])
+        y, x = divmod(head, stride)
+        if 0 < y <= grid_size and 0 < x <= grid_size:
+            up, down, left, right = y, grid_size + 1 - y, x, grid_size + 1 - x
+        else:
+            up = down = left = right = 0
 
-        def get_item_dist(direction, items_lst):
+        def get_item_dist(ray: slice, item: int):
             """Returns normalized Manhattan distance [0-1] to nearest item.
             Returns 1 if no item in that direction."""
-            y, x = snake_head
-            dy, dx = direction
-            distance = 1
-
-            while 0 <= y < GRID_SIZE and 0 <= x < GRID_SIZE:
-                if [y, x] in items_lst:
-                    dist_y = abs(y - snake_head[0])
-                    dist_x = abs(x - snake_head[1])
-                    distance = (dist_y + dist_x) / GRID_SIZE
-                    break
-                y += dy
-                x += dx
-            return distance
-
-        directions = [[-1, 0], [1, 0], [0, -1], [0, 1]]
-        state = []
-        y, x = snake_head
+            distance = cells[ray].find(item)
+            return distance / grid_size if distance >= 0 else 1
+
+        def get_body_dist(ray: slice):
+            """Returns normalized Manhattan distance [0-1] to nearest body
+            segment, the head itself excluded. Returns 1 if no body."""
+            if cells[head] == Board.WALL:
+                return 1
+            if body[head] > 1:
+                return 0
+            segment = body[ray]
+            free = len(segment) - len(segment.lstrip(b"\0"))
+            if free == len(segment):
+                return 1
+            return (free + 1) / grid_size
+
+        state = [up / grid_size, down / grid_size,
+                 left / grid_size, right / grid_size]
         direct_collisions = [
-            1 if (y-1 < 0 or [y-1, x] in snake[1:]) else 0,
-            1 if (y+1 >= GRID_SIZE or [y+1, x] in snake[1:]) else 0,
-            1 if (x-1 < 0 or [y, x-1] in snake[1:]) else 0,
-            1 if (x+1 >= GRID_SIZE or [y, x+1] in snake[1:]) else 0
+            1 if (y <= 1 or body[head - stride]) else 0,
+            1 if (y >= grid_size or body[head + stride]) else 0,
+            1 if (x <= 1 or body[head - 1]) else 0,
+            1 if (x >= grid_size or body[head + 1]) else 0,
         ]
+        # Cells from the head to the wall, then without the head
+        rays = (slice(head, head - stride * up, -stride),
+                slice(head, head + stride * down, stride),
+                slice(head, head - left, -1),
+                slice(head, head + right))
+        beyond = (slice(head - stride, head - stride * up, -stride),
+                  slice(head + stride, head + stride * down, stride),
+                  slice(head - 1, head - left, -1),
+                  slice(head + 1, head + right))
 
-        for direction in directions:
-            state.append(get_collision_dist(direction))
-        for direction in directions:
-            state.append(get_item_dist(direction, green_fruits))
-        for direction in directions:
-            state.append(get_item_dist(direction, red_fruits))
-        for direction in directions:
-            state.append(get_item_dist(direction, snake[1:]))
+        for ray in rays:
+            state.append(get_item_dist(ray, Board.GREEN))
+        for ray in rays:
+            state.append(get_item_dist(ray, Board.RED))
+        for ray in beyond:
+            state.append(get_body_dist(ray))
         state.extend(direct_collisions)
         return state
 
-    @staticmethod
-    def get_reward(snake_head: list[int],
+    def get_reward(self,
+                   snake_head: list[int],
                    snake_body: list[list],
                    green_fruits: list[list],
-                   red_fruits: list[list]
+                   red_fruits: list[list],
+                   board: Board | None = None
                    ) -> tuple[int, bool]:
         """Returns reward and game over state based on snake's position.
 
@@ -87,23 +114,32 @@ class Interpreter:
             `snake_body`: Snake coordinates [[y,x], ...]
             `green_fruits`: Green fruit coordinates [[y,x], ...]
             `red_fruits`: Red fruit coordinates [[y,x], ...]
+            `board`: Occupancy grid of the same game, built from the
+                lists if not given
 
         Returns:
             `tuple`: (reward, game_over)
         """
         gameover = True
         Ok = False
+        config = self.config
+
+        if board is None:
+            board = Board.from_lists(snake_body, green_fruits, red_fruits,
+                                     config.grid_size)
+        head = board.pack(*snake_head)
+        cell = board.cells[head]
 
-        if snake_head in snake_body[1:]:
-            return R_COLLISION, gameover
-        elif GRID_SIZE in snake_head or -1 in snake_head:
-            return R_COLLISION, gameover
-        elif snake_head in green_fruits:
-            return R_GREEN_FRUIT, Ok
-        elif snake_head in red_fruits:
+        if board.body[head] > 1:
+            return config.r_collision, gameover
+        elif cell == Board.WALL:
+            return config.r_collision, gameover
+        elif cell == Board.GREEN:
+            return config.r_green_fruit, Ok
+        elif cell == Board.RED:
             if len(snake_body) <= 1:
                 gameover = True
-                return R_COLLISION, gameover
-            return R_RED_FRUIT, Ok
+                return config.r_collision, gameover
+            return config.r_red_fruit, Ok
         else:
             return 0, Ok
@@ -1,5 +1,9 @@
+import copy
+import os
 import numpy as np
 import torch
+from contextlib import nullcontext
+from .SumTree import SumTree
 
 
 class Memory:
@@ -8,6 +12,9 @@ class Memory:
     Args:
         `memory_size`: Maximum size of buffer
         `device`: Device to store tensors (cuda/cpu)
+        `n_step`: Steps summed in each stored return, 1 for plain
+            transitions
+        `gamma`: Discount of the n-step returns
 
     Implementation:
         Uses np arrays as circular buffers to store transitions:
@@ -17,25 +24,133 @@ class Memory:
         - next_states[memory_size, state_size]
         - dones[memory_size]
 
-        New entries overwrite oldest when full.
+        New entries overwrite oldest when full. Write position and size
+        live in `counters`, so that `share_memory` can move them to
+        shared memory together with the buffers.
+
+        Sampling goes through torch views of the same arrays: indices are
+        drawn into a reused tensor and rows gathered with `index_select`
+        into preallocated batch tensors, so a sample allocates nothing.
+        Drawing and gathering hold the write lock, so that a sampled row
+        never mixes fields of two transitions written by another process.
+
+    N-step returns:
+        With `n_step` > 1, pushed steps wait in per-stream accumulators
+        (one stream per row of `push_batch`, a single one for `push`):
+        - pending_states[S, n, 20], pending_actions[S, n]
+        - pending_rewards[S, n]: zero after the last pending step
+        - pending_len[S]: number of pending steps of each stream
+
+        A stream holding n steps stores its oldest one as (s_t, a_t,
+        sum gamma^k r_t+k, s_t+n, False). When an episode ends, every
+        pending step of the stream is stored with the return up to the
+        end and done set, so no return crosses an episode boundary.
+        Accumulators belong to each process copy of the memory and are
+        not saved in checkpoints.
     """
-    def __init__(self, memory_size: int, device: torch.device):
+    BUFFERS = ("states", "actions", "rewards", "next_states", "dones")
+    FIELDS = BUFFERS + ("counters",)
+
+    def __init__(self,
+                 memory_size: int,
+                 device: torch.device,
+                 n_step: int = 1,
+                 gamma: float = 0.9):
         self.device = device
         self.memory_size = memory_size
-        self.position = 0
-        self.size = 0
+        self.counters = np.zeros(2, dtype=np.int64)
+        self.shared = None
+        self.lock = nullcontext()
+        self.n_step = n_step
+        self.gamma = gamma
+        # discounts[j, k]: weight of reward k in the return of step j
+        k = np.arange(n_step)
+        self.discounts = np.where(k[None, :] >= k[:, None],
+                                  gamma ** (k[None, :] - k[:, None]),
+                                  0).astype(np.float32)
+        self.pending_len = None
 
         self.states = np.zeros((memory_size, 20), dtype=np.float32)
         self.actions = np.zeros(memory_size, dtype=np.int64)
         self.rewards = np.zeros(memory_size, dtype=np.float32)
         self.next_states = np.zeros((memory_size, 20), dtype=np.float32)
         self.dones = np.zeros(memory_size, dtype=np.float32)
+        self.bind_tensors()
+
+    def bind_tensors(self) -> None:
+        """Create torch views of the buffers and drop batch buffers."""
+        self.tensors = {name: torch.from_numpy(getattr(self, name))
+                        for name in self.BUFFERS}
+        self.batch = None
+
+    def allocate_batch(self, batch_size: int) -> None:
+        """Allocate reused index and batch tensors for `batch_size`."""
+        self.indices = torch.empty(batch_size, dtype=torch.int64)
+        self.batch = {name: torch.empty((batch_size,) + tensor.shape[1:],
+                                        dtype=tensor.dtype)
+                      for name, tensor in self.tensors.items()}
+        self.device_batch = self.batch
+        if torch.device(self.device).type != "cpu":
+            self.batch = {name: tensor.pin_memory()
+                          for name, tensor in self.batch.items()}
+            self.device_batch = {name: torch.empty_like(tensor,
+                                                        device=self.device)
+                                 for name, tensor in self.batch.items()}
+
+    @property
+    def position(self) -> int:
+        """Index of the next write."""
+        return int(self.counters[0])
+
+    @property
+    def size(self) -> int:
+        """Number of stored transitions."""
+        return int(self.counters[1])
+
+    def share_memory(self, lock) -> None:
+        """Move buffers to shared memory for multi-process training.
+
+        Copies of this memory sent to other processes write into and read
+        from the same buffers. Writes and samples are serialized with
+        `lock`.
+
+        Args:
+            `lock`: Lock from the multiprocessing context of the processes
+        """
+        self.shared = {name: torch.from_numpy(getattr(self, name))
+                       .clone().share_memory_()
+                       for name in self.FIELDS}
+        self.lock = lock
+        self.bind_shared()
+
+    def bind_shared(self) -> None:
+        """Point numpy buffers to the shared tensors."""
+        for name, tensor in self.shared.items():
+            setattr(self, name, tensor.numpy())
+        self.bind_tensors()
+
+    def __getstate__(self) -> dict:
+        """Send shared tensors instead of copies of numpy buffers."""
+        state = self.__dict__.copy()
+        for name in ("tensors", "batch", "device_batch", "indices"):
+            state.pop(name, None)
+        if self.shared is not None:
+            for name in self.FIELDS:
+                del state[name]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.shared is not None:
+            self.bind_shared()
+        else:
+            self.bind_tensors()
 
     def push(self,
-             state: list,
+             state: list | np.ndarray,
              action: int,
              reward: float,
-             next_state: list,
+             next_state: list | np.ndarray,
              done: bool
              ) -> None:
         """Add transition to circular buffer, overwriting oldest if full.
@@ -47,33 +162,295 @@ class Memory:
             `next_state`: Next state vector
             `done`: Whether episode ended
         """
-        self.states[self.position] = np.array(state)
-        self.actions[self.position] = action
-        self.rewards[self.position] = reward
-        self.next_states[self.position] = np.array(next_state)
-        self.dones[self.position] = done
+        if self.n_step > 1:
+            self.push_batch(np.asarray([state]), np.asarray([action]),
+                            np.asarray([reward]), np.asarray([next_state]),
+                            np.asarray([done]))
+            return
+        with self.lock:
+            position = self.position
+            self.states[position] = state
+            self.actions[position] = action
+            self.rewards[position] = reward
+            self.next_states[position] = next_state
+            self.dones[position] = done
+            self.on_write(position)
 
-        self.position = (self.position + 1) % self.memory_size
-        self.size = min(self.size + 1, self.memory_size)
+            self.counters[0] = (position + 1) % self.memory_size
+            self.counters[1] = min(self.size + 1, self.memory_size)
+
+    def push_batch(self,
+                   states: np.ndarray,
+                   actions: np.ndarray,
+                   rewards: np.ndarray,
+                   next_states: np.ndarray,
+                   dones: np.ndarray
+                   ) -> None:
+        """Add a batch of transitions, one per row of each array.
+
+        Args:
+            `states`: Current state vectors [N, 20]
+            `actions`: Actions taken (0-3) [N]
+            `rewards`: Rewards received [N]
+            `next_states`: Next state vectors [N, 20]
+            `dones`: Whether each episode ended [N]
+        """
+        if self.n_step > 1:
+            self.accumulate(states, actions, rewards, next_states, dones)
+        else:
+            self.store(states, actions, rewards, next_states, dones)
+
+    def accumulate(self,
+                   states: np.ndarray,
+                   actions: np.ndarray,
+                   rewards: np.ndarray,
+                   next_states: np.ndarray,
+                   dones: np.ndarray
+                   ) -> None:
+        """Add one step per stream and store the n-step transitions
+        that are complete. Arguments are those of `push_batch`."""
+        streams = len(actions)
+        if self.pending_len is None:
+            self.pending_states = np.zeros((streams, self.n_step, 20),
+                                           dtype=np.float32)
+            self.pending_actions = np.zeros((streams, self.n_step),
+                                            dtype=np.int64)
+            self.pending_rewards = np.zeros((streams, self.n_step),
+                                            dtype=np.float32)
+            self.pending_len = np.zeros(streams, dtype=np.int64)
+        elif streams != len(self.pending_len):
+            raise ValueError(f"Pushed {streams} streams, expected "
+                             f"{len(self.pending_len)}")
+
+        rows = np.arange(streams)
+        self.pending_states[rows, self.pending_len] = states
+        self.pending_actions[rows, self.pending_len] = actions
+        self.pending_rewards[rows, self.pending_len] = rewards
+        self.pending_len += 1
+
+        dones = np.asarray(dones, dtype=bool)
+        full = (self.pending_len == self.n_step) & ~dones
+        ready = np.flatnonzero(full | dones)
+        if ready.size == 0:
+            return
+        returns = self.pending_rewards[ready] @ self.discounts.T
+
+        # Full streams store their oldest step, ended ones every step
+        steps = np.arange(self.n_step)
+        stored = np.where(dones[ready, None],
+                          steps < self.pending_len[ready, None],
+                          steps == 0)
+        row, step = np.nonzero(stored)
+        sources = ready[row]
+        self.store(self.pending_states[sources, step],
+                   self.pending_actions[sources, step],
+                   returns[row, step],
+                   np.asarray(next_states)[sources],
+                   dones[sources])
+
+        shifted = np.flatnonzero(full)
+        self.pending_states[shifted, :-1] = self.pending_states[shifted, 1:]
+        self.pending_actions[shifted, :-1] = self.pending_actions[shifted,
+                                                                  1:]
+        self.pending_rewards[shifted, :-1] = self.pending_rewards[shifted,
+                                                                  1:]
+        self.pending_rewards[shifted, -1] = 0
+        self.pending_len[shifted] -= 1
+        self.pending_rewards[dones] = 0
+        self.pending_len[dones] = 0
+
+    def store(self,
+              states: np.ndarray,
+              actions: np.ndarray,
+              rewards: np.ndarray,
+              next_states: np.ndarray,
+              dones: np.ndarray
+              ) -> None:
+        """Write transitions to the circular buffers, one per row."""
+        n = len(actions)
+        with self.lock:
+            i = (self.position + np.arange(n)) % self.memory_size
+            self.states[i] = states
+            self.actions[i] = actions
+            self.rewards[i] = rewards
+            self.next_states[i] = next_states
+            self.dones[i] = dones
+            self.on_write(i)
+
+            self.counters[0] = (self.position + n) % self.memory_size
+            self.counters[1] = min(self.size + n, self.memory_size)
 
     def sample(self, batch_size: int) -> tuple[torch.Tensor]:
         """Sample random batch of transitions.
 
+        The returned tensors are reused by the next call, they must not be
+        kept across samples.
+
         Args:
             `batch_size`: Number of transitions to sample
 
         Returns:
             `tuple`: (states, actions, rewards, next_states, dones) as tensors
         """
-        i: np.ndarray = np.random.choice(self.size, batch_size)
-        return (
-            torch.FloatTensor(self.states[i]).to(self.device),
-            torch.LongTensor(self.actions[i]).to(self.device),
-            torch.FloatTensor(self.rewards[i]).to(self.device),
-            torch.FloatTensor(self.next_states[i]).to(self.device),
-            torch.FloatTensor(self.dones[i]).to(self.device)
-        )
+        if self.batch is None or len(self.indices) != batch_size:
+            self.allocate_batch(batch_size)
+        with self.lock:
+            torch.randint(self.size, (batch_size,), out=self.indices)
+            self.gather()
+        return self.to_device()
+
+    def gather(self) -> None:
+        """Gather rows at `self.indices` into the batch tensors, called
+        under lock."""
+        for name, tensor in self.tensors.items():
+            torch.index_select(tensor, 0, self.indices, out=self.batch[name])
+
+    def to_device(self) -> tuple[torch.Tensor]:
+        """Return the gathered batch on the memory device."""
+        if self.device_batch is not self.batch:
+            for name in self.BUFFERS:
+                self.device_batch[name].copy_(self.batch[name],
+                                              non_blocking=True)
+        return tuple(self.device_batch[name] for name in self.BUFFERS)
+
+    def on_write(self, indices: int | np.ndarray) -> None:
+        """Hook called under lock after transitions are written."""
+
+    def save(self, directory: str) -> None:
+        """Write buffers as memory-mapped `.npy` files in `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            for name in self.FIELDS:
+                array = getattr(self, name)
+                path = os.path.join(directory, f"{name}.npy")
+                mapped = np.lib.format.open_memmap(path, mode="w+",
+                                                   dtype=array.dtype,
+                                                   shape=array.shape)
+                mapped[:] = array
+                mapped.flush()
+                del mapped
+
+    def load(self, directory: str) -> None:
+        """Read buffers written by `save` into this memory."""
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            mapped = np.load(os.path.join(directory, f"{name}.npy"),
+                             mmap_mode="r")
+            if mapped.shape != array.shape:
+                raise ValueError(f"Replay '{name}' has shape {mapped.shape}"
+                                 f", expected {array.shape}")
+            array[:] = mapped
 
     def __len__(self) -> int:
         """Return current size of the replay buffer."""
         return self.size
+
+
+class PrioritizedMemory(Memory):
+    """Prioritized experience replay buffer.
+
+    Args:
+        `memory_size`: Maximum size of buffer
+        `device`: Device to store tensors (cuda/cpu)
+        `alpha`: How much priorities shape sampling (0 is uniform)
+        `beta`: Initial importance-sampling exponent, annealed to 1
+        `beta_steps`: Number of samples to anneal `beta` over
+        `n_step`: Steps summed in each stored return, see `Memory`
+        `gamma`: Discount of the n-step returns
+
+    Implementation:
+        Transitions are drawn with probability p_i^alpha / sum(p^alpha)
+        from a `SumTree`, where p_i is the last TD error of transition i
+        (plus `epsilon`). New transitions get the largest priority seen.
+        `sample` also returns importance-sampling weights
+        (N * P(i))^-beta, normalized by their max, and the sampled indices
+        to pass back to `update_priorities` with the new TD errors.
+    """
+    FIELDS = Memory.FIELDS + ("priorities",)
+
+    def __init__(self,
+                 memory_size: int,
+                 device: torch.device,
+                 alpha: float = 0.6,
+                 beta: float = 0.4,
+                 beta_steps: int = 100_000,
+                 n_step: int = 1,
+                 gamma: float = 0.9):
+        self.tree = SumTree(memory_size)
+        self.priorities = self.tree.nodes
+        super().__init__(memory_size, device, n_step, gamma)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = (1.0 - beta) / beta_steps
+        self.epsilon = 1e-5
+
+    def bind_shared(self) -> None:
+        super().bind_shared()
+        self.tree.nodes = self.priorities
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        if self.shared is not None:
+            state["tree"] = copy.copy(self.tree)
+            state["tree"].nodes = None
+        return state
+
+    def allocate_batch(self, batch_size: int) -> None:
+        super().allocate_batch(batch_size)
+        self.weights = torch.empty(batch_size, dtype=torch.float32,
+                                   device=self.device)
+
+    def on_write(self, indices: int | np.ndarray) -> None:
+        """Give new transitions the largest priority seen."""
+        if np.isscalar(indices):
+            self.tree.update(indices, self.tree.max_priority)
+        else:
+            self.tree.update(indices, np.full(len(indices),
+                                              self.tree.max_priority))
+
+    def sample(self, batch_size: int) -> tuple[torch.Tensor]:
+        """Sample batch of transitions proportionally to priorities.
+
+        The returned tensors are reused by the next call, they must not be
+        kept across samples.
+
+        Args:
+            `batch_size`: Number of transitions to sample
+
+        Returns:
+            `tuple`: (states, actions, rewards, next_states, dones,
+            weights) as tensors, then sampled indices as np.ndarray
+        """
+        if self.batch is None or len(self.indices) != batch_size:
+            self.allocate_batch(batch_size)
+
+        # One uniform value in each of batch_size equal segments
+        segments = np.arange(batch_size) + np.random.random(batch_size)
+        with self.lock:
+            total = self.tree.total
+            size = self.size
+            indices = np.minimum(self.tree.find(segments
+                                                * (total / batch_size)),
+                                 size - 1)
+            self.indices.copy_(torch.from_numpy(indices))
+            probabilities = self.tree.get(indices) / total
+            self.gather()
+
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        weights = (size * probabilities) ** -self.beta
+        self.weights.copy_(torch.from_numpy(weights / weights.max()))
+        return self.to_device() + (self.weights, indices)
+
+    def update_priorities(self,
+                          indices: np.ndarray,
+                          td_errors: np.ndarray
+                          ) -> None:
+        """Set new priorities of sampled transitions from TD errors.
+
+        Args:
+            `indices`: Indices returned by `sample`
+            `td_errors`: Absolute TD errors of these transitions
+        """
+        with self.lock:
+            self.tree.update(indices,
+                             (td_errors + self.epsilon) ** self.alpha)
@@ -0,0 +1,78 @@
+import numpy as np
+
+LAYERS = ("fc1", "fc2", "fc3")
+
+
+class NumpyQNetwork:
+    """Inference-only copy of a `QNetwork` running on numpy.
+
+    Args:
+        `weights`: `QNetwork` state dict as numpy arrays
+            ("fc1.weight", "fc1.bias", ... "fc3.bias")
+
+    Implementation:
+        Weights are stored transposed and contiguous so each layer is one
+        `np.dot(x, W, out=h)` into a preallocated activation, followed by
+        an in-place ReLU. Activations are kept for the last batch size,
+        so repeated single-state calls allocate nothing. The returned
+        Q-values array is reused by the next call.
+
+        This module imports numpy only: processes that just play a
+        trained network do not need to load torch.
+    """
+    def __init__(self, weights: dict[str, np.ndarray]):
+        self.weights = [np.ascontiguousarray(weights[f"{name}.weight"].T,
+                                             dtype=np.float32)
+                        for name in LAYERS]
+        self.biases = [np.array(weights[f"{name}.bias"], dtype=np.float32)
+                       for name in LAYERS]
+        self.allocate(1)
+
+    @staticmethod
+    def from_state_dict(state_dict: dict) -> "NumpyQNetwork":
+        """Build from a torch state dict (tensors on any device)."""
+        return NumpyQNetwork({name: tensor.detach().cpu().numpy()
+                              for name, tensor in state_dict.items()})
+
+    @staticmethod
+    def load_torch(path: str) -> dict[str, np.ndarray]:
+        """Read a `.pt` model file as numpy weights (imports torch)."""
+        import torch
+        state_dict = torch.load(path, map_location="cpu")
+        return {name: tensor.numpy() for name, tensor in state_dict.items()}
+
+    def allocate(self, batch_size: int) -> None:
+        """Allocate activations of every layer for `batch_size` rows."""
+        self.input = np.empty((batch_size, self.weights[0].shape[0]),
+                              dtype=np.float32)
+        self.activations = [np.empty((batch_size, weight.shape[1]),
+                                     dtype=np.float32)
+                            for weight in self.weights]
+
+    def __call__(self, states: list | np.ndarray) -> np.ndarray:
+        """Forward pass.
+
+        Args:
+            `states`: State vector [20] or batch of vectors [N, 20]
+
+        Returns:
+            `np.ndarray`: Q-values [4] or [N, 4], reused by the next call
+        """
+        states = np.asarray(states, dtype=np.float32)
+        single = states.ndim == 1
+        batch_size = 1 if single else len(states)
+        if len(self.input) != batch_size:
+            self.allocate(batch_size)
+        self.input[:] = states
+
+        x = self.input
+        last = len(self.weights) - 1
+        for i, (weight, bias, h) in enumerate(zip(self.weights,
+                                                  self.biases,
+                                                  self.activations)):
+            np.dot(x, weight, out=h)
+            h += bias
+            if i != last:
+                np.maximum(h, 0, out=h)
+            x = h
+        return x[0] if single else x
@@ -1,9 +1,23 @@
+import os
 import random
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
-from .Memory import Memory
+from .Memory import Memory, PrioritizedMemory
+from .NumpyQNetwork import NumpyQNetwork
+from .StepRecord import StepRecord
+from ..game.Profiler import Profiler
+
+ACT = Profiler.phase("act")
+PUSH = Profiler.phase("memory.push")
+LEARN = Profiler.phase("learn")
+SAMPLE = Profiler.phase("learn.sample")
+FORWARD = Profiler.phase("learn.forward")
+BACKWARD = Profiler.phase("learn.backward")
+OPTIMIZER = Profiler.phase("learn.optimizer")
+TARGET_SYNC = Profiler.phase("learn.target_sync")
 
 
 class QNetwork(nn.Module):
@@ -24,17 +38,17 @@ class QNetwork(nn.Module):
         self.fc3 = nn.Linear(hidden_size // 2, output_size)
         self.to(self.device)
 
-    def forward(self, state: list) -> torch.Tensor:
+    def forward(self, state: list | np.ndarray) -> torch.Tensor:
         """Forward pass through network.
 
         Args:
-            `state`: Current game state vector
+            `state`: Current game state vector, or batch of vectors
 
         Returns:
             `torch.Tensor`: Q-values for each possible action
         """
         if not isinstance(state, torch.Tensor):
-            state = torch.FloatTensor(state)
+            state = torch.as_tensor(state, dtype=torch.float32)
         state = state.to(self.device)
         hidden = F.relu(self.fc1(state))
         hidden = F.relu(self.fc2(hidden))
@@ -48,14 +62,54 @@ class SnakeAgent:
     Args:
         `training`: Whether agent is training or just playing
         `model`: Optional path to pretrained model file
+        `learn_every`: Environment steps between two learn calls
+        `gradient_steps`: Gradient steps run by each learn call
+        `warmup`: Transitions stored before the first learn call, at
+            least one batch
+        `prioritized`: Whether to use prioritized experience replay
+        `double_dqn`: Whether to use Double DQN targets
+        `n_step`: Rewards summed before bootstrapping, 1 for one-step
+            targets
+
+    Targets:
+        One-step targets are r + gamma * max_a Q_target(s', a). With
+        `double_dqn`, the online network picks the next action and the
+        target network evaluates it, which removes the max bias of
+        Q-values. With `n_step`, the replay memory stores n-step returns
+        and targets bootstrap with gamma^n from the state n steps later.
+
+    Inference:
+        Without training, actions and Q-values come from a
+        `NumpyQNetwork` copy of the Q-network, refreshed by `load_model`
+        and `load_weights`, which skips torch dispatch on small batches.
+
+    Schedules:
+        Epsilon decays by `epsilon_decay` per environment step once
+        learning started, whatever `learn_every` is. The target network
+        is synced every `target_update_freq` gradient steps.
     """
-    def __init__(self, training: bool = True, model: str = None):
+    def __init__(self,
+                 training: bool = True,
+                 model: str = None,
+                 learn_every: int = 1,
+                 gradient_steps: int = 1,
+                 warmup: int = 0,
+                 prioritized: bool = False,
+                 double_dqn: bool = False,
+                 n_step: int = 1):
         self.epsilon = 0.9 if training else 0
         self.epsilon_min = 0.05
+        self.epsilon_decay = 0.998
 
         self.lr = 0.0005
         self.gamma = 0.90
         self.batch_size = 1000
+        self.learn_every = learn_every
+        self.gradient_steps = gradient_steps
+        self.warmup = max(warmup, self.batch_size)
+        self.double_dqn = double_dqn
+        self.n_step = n_step
+        self.bootstrap_gamma = self.gamma ** n_step
 
         # Q-Network
         self.model = QNetwork(20, 128, 4)
@@ -68,10 +122,24 @@ class SnakeAgent:
             self.target_model.load_state_dict(self.model.state_dict())
             self.target_update_freq = 2000
             self.steps = 0
+            self.env_steps = 0
+            self.loss_sum = 0.0
+            self.loss_count = 0
 
-            self.memory = Memory(100_000, self.model.device)
+            self.prioritized = prioritized
+            if self.prioritized:
+                self.memory = PrioritizedMemory(100_000, self.model.device,
+                                                n_step=n_step,
+                                                gamma=self.gamma)
+            else:
+                self.memory = Memory(100_000, self.model.device,
+                                     n_step=n_step, gamma=self.gamma)
             self.criterion = nn.MSELoss()
             self.optimizer = optim.Adam(self.model.parameters(), lr=self.lr)
+            self.inference = None
+        else:
+            self.inference = NumpyQNetwork.from_state_dict(
+                self.model.state_dict())
         if model:
             self.load_model(model)
 
@@ -88,6 +156,13 @@ class SnakeAgent:
         if random.random() < self.epsilon:
             return random.randint(0, 3)
 
+        if self.inference is not None:
+            q_values = self.inference(state)
+            if debug:
+                print(f"QVALUES: {q_values}")
+                print(f"Index delected: {q_values.argmax()}")
+            return int(q_values.argmax())
+
         with torch.no_grad():
             state = torch.FloatTensor(state).unsqueeze(0)
             q_values = self.model(state)
@@ -96,40 +171,139 @@ class SnakeAgent:
                 print(f"Index delected: {q_values.argmax().item()}")
             return q_values.argmax().item()
 
+    def act(self, record: StepRecord) -> int:
+        """Select action of a step with epsilon-greedy policy.
+
+        Greedy choices reuse the Q-values of the record, or compute and
+        store them in it.
+
+        Args:
+            `record`: Record of the current step
+
+        Returns:
+            `int`: Selected action (0-3)
+        """
+        with ACT:
+            if random.random() < self.epsilon:
+                return random.randint(0, 3)
+            q_values = self.evaluate(record)
+            return max(range(len(q_values)), key=q_values.__getitem__)
+
+    def evaluate(self, record: StepRecord) -> list:
+        """Return Q-values of a step, computing them once."""
+        if record.q_values is None:
+            record.q_values = self.get_action_values(record.state)
+        return record.q_values
+
+    def get_actions(self, states: np.ndarray) -> np.ndarray:
+        """Select one action per state with epsilon-greedy policy.
+
+        Exploration is drawn per row, then a single forward pass runs on
+        the rows that act greedily.
+
+        Args:
+            `states`: Batch of state vectors [N, 20]
+
+        Returns:
+            `np.ndarray`: Selected actions (0-3) [N]
+        """
+        explore = np.random.random(len(states)) < self.epsilon
+        actions = np.random.randint(0, 4, size=len(states))
+        if not explore.all():
+            greedy = ~explore
+            if self.inference is not None:
+                q_values = self.inference(np.asarray(states)[greedy])
+                actions[greedy] = q_values.argmax(1)
+                return actions
+            with torch.no_grad():
+                q_values = self.model(np.asarray(states)[greedy])
+            actions[greedy] = q_values.argmax(1).cpu().numpy()
+        return actions
+
     def get_action_values(self, state: list) -> list:
         """Return Qvalues of the current state"""
+        if self.inference is not None:
+            return self.inference(state).tolist()
         with torch.no_grad():
             return self.model(state).tolist()
 
+    def get_actions_values(self, states: np.ndarray) -> np.ndarray:
+        """Return Qvalues of a batch of states [N, 20] as array [N, 4]."""
+        if self.inference is not None:
+            return self.inference(states).copy()
+        with torch.no_grad():
+            return self.model(states).cpu().numpy()
+
     def learn(self) -> None:
-        """Update network weights using experience replay."""
+        """Run `gradient_steps` updates and decay epsilon for the
+        `learn_every` environment steps since last call."""
         if len(self.memory) < self.batch_size:
             return
 
+        with LEARN:
+            for _ in range(self.gradient_steps):
+                self.gradient_step()
+
+        self.epsilon = max(self.epsilon_min,
+                           self.epsilon
+                           * self.epsilon_decay ** self.learn_every)
+
+    def gradient_step(self) -> None:
+        """Update network weights using experience replay."""
         # get a sample[batch_size] of experiences
-        (states, actions, rewards,
-         next_states, dones) = self.memory.sample(self.batch_size)
+        with SAMPLE:
+            batch = self.memory.sample(self.batch_size)
+        states, actions, rewards, next_states, dones = batch[:5]
 
-        # get q_values of each action taken in the sample
-        Q_values = self.model(states)
-        predictions = Q_values.gather(1, actions.unsqueeze(1))
+        with FORWARD:
+            # get q_values of each action taken in the sample
+            Q_values = self.model(states)
+            predictions = Q_values.gather(1, actions.unsqueeze(1))
 
-        with torch.no_grad():
-            next_Q_values = self.target_model(next_states)
-        max_Q_values = next_Q_values.max(1)[0]
-        # Q(s,a) = R + γ * max(Q(s',a')) / add (1 - dones) for terminal state
-        targets = rewards + self.gamma * max_Q_values * (1 - dones)
+            with torch.no_grad():
+                next_Q_values = self.target_model(next_states)
+                if self.double_dqn:
+                    # online network selects, target network evaluates
+                    next_actions = self.model(next_states).argmax(1)
+                    max_Q_values = next_Q_values.gather(
+                        1, next_actions.unsqueeze(1)).squeeze(1)
+                else:
+                    max_Q_values = next_Q_values.max(1)[0]
+            # Q(s,a) = R + γ^n * max(Q(s',a')) / (1 - dones) for terminal
+            targets = (rewards
+                       + self.bootstrap_gamma * max_Q_values * (1 - dones))
 
-        loss = self.criterion(predictions.squeeze(-1), targets)
-        self.optimizer.zero_grad()
-        loss.backward()
-        self.optimizer.step()
+            predictions = predictions.squeeze(-1)
+            if self.prioritized:
+                # weight squared TD errors and feed them back as priorities
+                weights, indices = batch[5:]
+                td_errors = targets - predictions
+                loss = (weights * td_errors.pow(2)).mean()
+                self.memory.update_priorities(
+                    indices, td_errors.detach().abs().cpu().numpy())
+            else:
+                loss = self.criterion(predictions, targets)
+        with BACKWARD:
+            self.optimizer.zero_grad()
+            loss.backward()
+        with OPTIMIZER:
+            self.optimizer.step()
+        self.loss_sum = self.loss_sum + loss.detach()
+        self.loss_count += 1
 
         self.steps += 1
         if self.steps % self.target_update_freq == 0:
-            self.target_model.load_state_dict(self.model.state_dict())
+            with TARGET_SYNC:
+                self.target_model.load_state_dict(self.model.state_dict())
 
-        self.epsilon = max(self.epsilon_min, self.epsilon * 0.998)
+    def pop_loss(self) -> float | None:
+        """Return mean loss since last call, None if no gradient step."""
+        if not self.loss_count:
+            return None
+        loss = float(self.loss_sum) / self.loss_count
+        self.loss_sum = 0.0
+        self.loss_count = 0
+        return loss
 
     def update(self,
                state: list,
@@ -138,7 +312,8 @@ class SnakeAgent:
                next_state: list,
                done: bool
                ) -> None:
-        """Store transition and perform learning step.
+        """Store transition and learn every `learn_every` steps once
+        `warmup` transitions are stored.
 
         Args:
             `state`: Current state vector
@@ -147,8 +322,12 @@ class SnakeAgent:
             `next_state`: Next state vector
             `done`: Whether episode ended
         """
-        self.memory.push(state, action, reward, next_state, done)
-        self.learn()
+        with PUSH:
+            self.memory.push(state, action, reward, next_state, done)
+        self.env_steps += 1
+        if (self.env_steps % self.learn_every == 0
+                and len(self.memory) >= self.warmup):
+            self.learn()
 
     def load_model(self, path: str) -> None:
         """Load pretrained model weights.
@@ -156,9 +335,19 @@ class SnakeAgent:
         Args:
             `path`: Path to model file
         """
-        self.model.load_state_dict(torch.load(path))
+        self.load_weights(torch.load(path, map_location=self.model.device))
         self.model.eval()
 
+    def load_weights(self, state_dict: dict) -> None:
+        """Load Q-network weights and refresh the numpy copy if any.
+
+        Args:
+            `state_dict`: Q-network state dict
+        """
+        self.model.load_state_dict(state_dict)
+        if self.inference is not None:
+            self.inference = NumpyQNetwork.from_state_dict(state_dict)
+
     def save_model(self, path: str) -> None:
         """Save current model weights.
 
@@ -166,3 +355,80 @@ class SnakeAgent:
             `path`: Path to save model file
         """
         torch.save(self.model.state_dict(), path)
+
+    def save_checkpoint(self, directory: str) -> None:
+        """Save everything needed to resume training.
+
+        Networks, optimizer, epsilon, step counters and learner options
+        go to `agent.pt`, replay buffers to memory-mapped files in
+        `memory/`.
+
+        Args:
+            `directory`: Checkpoint directory
+        """
+        os.makedirs(directory, exist_ok=True)
+        checkpoint = {
+            "model": self.model.state_dict(),
+            "target_model": self.target_model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "epsilon": self.epsilon,
+            "steps": self.steps,
+            "env_steps": self.env_steps,
+            **self.learner_options(),
+        }
+        if self.prioritized:
+            checkpoint["beta"] = self.memory.beta
+        torch.save(checkpoint, os.path.join(directory, "agent.pt"))
+        self.memory.save(os.path.join(directory, "memory"))
+
+    def learner_options(self) -> dict:
+        """Return the options that shape replay contents and targets."""
+        return {"prioritized": self.prioritized,
+                "n_step": self.n_step,
+                "double_dqn": self.double_dqn}
+
+    @staticmethod
+    def checkpoint_learner_options(directory: str,
+                                   checkpoint: dict | None = None
+                                   ) -> dict:
+        """Return the learner options a checkpoint was saved with.
+
+        Args:
+            `directory`: Checkpoint directory
+            `checkpoint`: Content of its `agent.pt`, read if not given
+
+        Returns:
+            `dict`: Options as returned by `learner_options`
+        """
+        if checkpoint is None:
+            checkpoint = torch.load(os.path.join(directory, "agent.pt"),
+                                    map_location="cpu")
+        return {name: checkpoint[name]
+                for name in ("prioritized", "n_step", "double_dqn")}
+
+    def load_checkpoint(self, directory: str) -> None:
+        """Restore a checkpoint written by `save_checkpoint`.
+
+        Args:
+            `directory`: Checkpoint directory
+
+        Raises:
+            `ValueError`: If the checkpoint learner options differ from
+                the agent ones
+        """
+        checkpoint = torch.load(os.path.join(directory, "agent.pt"),
+                                map_location=self.model.device)
+        saved = self.checkpoint_learner_options(directory, checkpoint)
+        if saved != self.learner_options():
+            raise ValueError(f"Checkpoint '{directory}' learner options "
+                             f"{saved} differ from "
+                             f"{self.learner_options()}")
+        self.model.load_state_dict(checkpoint["model"])
+        self.target_model.load_state_dict(checkpoint["target_model"])
+        self.optimizer.load_state_dict(checkpoint["optimizer"])
+        self.epsilon = checkpoint["epsilon"]
+        self.steps = checkpoint["steps"]
+        self.env_steps = checkpoint["env_steps"]
+        if self.prioritized:
+            self.memory.beta = checkpoint["beta"]
+        self.memory.load(os.path.join(directory, "memory"))
@@ -0,0 +1,20 @@
+class StepRecord:
+    """What the agent saw and did at one step.
+
+    Created with the observation of a step; Q-values are filled the first
+    time they are needed (action choice, AI panel or debug print), then
+    the action, reward and game over flag once the step is played. The
+    game loop, the renderer and the debug printers all read the same
+    record, so each observation is computed and evaluated once.
+
+    Args:
+        `state`: Observation vector of the step
+    """
+    __slots__ = ("state", "q_values", "action", "reward", "done")
+
+    def __init__(self, state: list):
+        self.state = state
+        self.q_values = None
+        self.action = None
+        self.reward = None
+        self.done = False
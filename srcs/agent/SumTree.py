@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class SumTree:
+    """Array-based binary sum-tree over `capacity` priorities.
+
+    Args:
+        `capacity`: Number of leaves (replay memory size)
+
+    Implementation:
+        Heap layout in a single array `nodes[2 * leaves]`, with the root
+        at index 1 and children of node i at 2i and 2i+1. Leaf j is node
+        `leaves + j`, with `leaves` the capacity rounded up to a power of
+        two. Index 0 is not part of the heap and stores the largest
+        priority ever set, used for new transitions.
+
+        Updates and sampling walk one root-to-leaf path: O(log n). Both
+        accept arrays and walk all paths level by level with numpy.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.depth = max(1, int(np.ceil(np.log2(capacity))))
+        self.leaves = 2 ** self.depth
+        self.nodes = np.zeros(2 * self.leaves, dtype=np.float64)
+        self.nodes[0] = 1.0
+
+    @property
+    def total(self) -> float:
+        """Sum of all priorities."""
+        return self.nodes[1]
+
+    @property
+    def max_priority(self) -> float:
+        """Largest priority ever set."""
+        return self.nodes[0]
+
+    def update(self, indices: int | np.ndarray,
+               priorities: float | np.ndarray) -> None:
+        """Set priorities of leaves and refresh their ancestors' sums.
+
+        Args:
+            `indices`: Leaf index or array of leaf indices
+            `priorities`: Priority or array of priorities, same shape
+        """
+        nodes = self.nodes
+        if np.isscalar(indices):
+            i = int(indices) + self.leaves
+            nodes[i] = priorities
+            nodes[0] = max(nodes[0], priorities)
+            i //= 2
+            while i:
+                nodes[i] = nodes[2 * i] + nodes[2 * i + 1]
+                i //= 2
+            return
+
+        i = np.asarray(indices) + self.leaves
+        nodes[i] = priorities
+        nodes[0] = max(nodes[0], np.max(priorities))
+        for _ in range(self.depth):
+            i = np.unique(i // 2)
+            nodes[i] = nodes[2 * i] + nodes[2 * i + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Return leaves whose prefix sum interval contains each value.
+
+        Args:
+            `values`: Array of values in [0, total)
+
+        Returns:
+            `np.ndarray`: Leaf indices, drawn proportionally to priority
+            when values are uniform
+        """
+        i = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * i
+            left_sum = self.nodes[left]
+            go_right = values >= left_sum
+            values = np.where(go_right, values - left_sum, values)
+            i = np.where(go_right, left + 1, left)
+        return i - self.leaves
+
+    def get(self, indices: np.ndarray) -> np.ndarray:
+        """Return priorities of leaves."""
+        return self.nodes[indices + self.leaves]
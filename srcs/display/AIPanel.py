@@ -1,4 +1,5 @@
 from .Colors import Colors as Col
+from .TextCache import TextCache
 from settings import WIDTH, MARGIN, HEIGHT
 import pygame as pg
 
@@ -10,8 +11,16 @@ class AIPanel:
     - State panel showing current input values
     - Neural network visualization with connections and activations
     - Gradients for neuron activation values
+
+    Borders, titles, labels, hidden layers and connections never change:
+    `draw_static` draws them once on the background layer, and the
+    per-frame methods only draw neurons and values. Positions depend on
+    the window size, set by `configure`.
     """
+    PANEL_X = WIDTH - MARGIN * 5
+
     # State panel const
+    STATE_PANEL_Y = 0
     STATE_PANEL_WIDTH = 310
     STATE_PANEL_HEIGHT = 200
     STATE_ROW_HEIGHT = 30
@@ -19,6 +28,7 @@ class AIPanel:
 
     # Neural network const
     NN_WIDTH = 475
+    NN_Y = 220
     NN_HEIGHT = min(HEIGHT - 230, 400)
     NN_LAYER_SPACING = 100
     NN_INPUT_SPACING = 15
@@ -35,6 +45,12 @@ class AIPanel:
         Col.PG_CYAN       # Collisions
     ]
 
+    @classmethod
+    def configure(cls, width: int, height: int) -> None:
+        """Place the panels on the right of a window of that size."""
+        cls.PANEL_X = width - MARGIN * 5
+        cls.NN_HEIGHT = min(height - 230, 400)
+
     @classmethod
     def get_gradient_color(cls, value: float, category: int = None) -> tuple:
         """Return gradient color based on value and optional category.
@@ -82,8 +98,7 @@ class AIPanel:
         pg.draw.rect(surface, Col.PG_WHITE, panel_rect, 1)
 
         # Title
-        font = pg.font.Font(None, 24)
-        title_surf = font.render(title, True, Col.PG_CYAN)
+        title_surf = TextCache.render(title, 24, Col.PG_CYAN)
         title_rect = title_surf.get_rect(
             top=y + 5,
             centerx=x + width // 2
@@ -98,9 +113,8 @@ class AIPanel:
             `surface`: Pygame surface to draw on
             `x`, `y`: Starting position for drawing
         """
-        small_font = pg.font.Font(None, 16)
         for i, direction in enumerate(cls.DIRECTIONS):
-            text = small_font.render(direction, True, Col.PG_CYAN)
+            text = TextCache.render(direction, 16, Col.PG_CYAN)
             rect = text.get_rect(
                 left=x + 80 + i * cls.STATE_DIR_WIDTH,
                 top=y
@@ -108,24 +122,30 @@ class AIPanel:
             surface.blit(text, rect)
 
     @classmethod
-    def draw_state_category(cls, surface, x, y, row, category, values, is_ai):
-        """Draw a category row in the state panel.
+    def draw_state_category_name(cls, surface, x, y, row, category):
+        """Draw the name of a category row in the state panel.
 
         Args:
             `surface`: Pygame surface to draw on
             `x`, `y`: Starting position
             `row`: Row index
             `category`: Category name
-            `values`: State values to display
-            `is_ai`: Whether AI control is active
         """
-        small_font = pg.font.Font(None, 16)
-
-        # Category name
-        cat_text = small_font.render(category, True, cls.BASE_COLORS[row])
+        cat_text = TextCache.render(category, 16, cls.BASE_COLORS[row])
         cat_rect = cat_text.get_rect(left=x + 10, top=y)
         surface.blit(cat_text, cat_rect)
 
+    @classmethod
+    def draw_state_category(cls, surface, x, y, row, values, is_ai):
+        """Draw the values of a category row in the state panel.
+
+        Args:
+            `surface`: Pygame surface to draw on
+            `x`, `y`: Starting position
+            `row`: Row index
+            `values`: State values to display
+            `is_ai`: Whether AI control is active
+        """
         # Draw circle + value for each direction
         for col in range(len(cls.DIRECTIONS)):
             value = values[row * 4 + col]
@@ -138,67 +158,139 @@ class AIPanel:
             # Print ':.2f' if distance or 1/0 for collision
             format_str = "{}" if row == 4 else "{:.2f}"
 
-            text = small_font.render(
-                format_str.format(value),
-                True,
-                Col.PG_WHITE)
+            text = TextCache.render(format_str.format(value),
+                                    16,
+                                    Col.PG_WHITE)
             surface.blit(text, text.get_rect(left=pos_x + 20, top=y))
 
+    @classmethod
+    def draw_static(cls, surface):
+        """Draw the parts of both panels that never change.
+
+        Args:
+            `surface`: Pygame surface to draw on, the background layer
+        """
+        # State panel
+        cls.draw_panel_background(
+            surface, cls.PANEL_X, cls.STATE_PANEL_Y,
+            cls.STATE_PANEL_WIDTH, cls.STATE_PANEL_HEIGHT,
+            "Snake State"
+        )
+        header_y = cls.STATE_PANEL_Y + 35
+        cls.draw_state_direction(surface, cls.PANEL_X, header_y)
+        for row, category in enumerate(cls.CATEGORIES):
+            cls.draw_state_category_name(
+                surface, cls.PANEL_X,
+                header_y + 20 + row * cls.STATE_ROW_HEIGHT,
+                row, category
+            )
+
+        # Neural network panel
+        cls.draw_panel_background(
+            surface, cls.PANEL_X, cls.NN_Y,
+            cls.NN_WIDTH, cls.NN_HEIGHT,
+            "Neural Network"
+        )
+        input_x, hidden1_x, hidden2_x, _ = cls.layers_x()
+        cls.draw_hidden_layers(surface, hidden1_x, cls.NN_Y, cls.NN_HEIGHT)
+
+        # Lines
+        mid_y = cls.NN_Y + cls.NN_HEIGHT//2
+        for in_pos in cls.input_positions():
+            pg.draw.line(surface, Col.PG_CYAN, (in_pos[0] + 2, in_pos[1]),
+                         (hidden1_x - 20, mid_y), 1)
+
+        pg.draw.line(surface, Col.PG_CYAN,
+                     (hidden1_x + 20, mid_y),
+                     (hidden2_x - 20, mid_y), 1)
+
+        for out_pos in cls.output_positions():
+            pg.draw.line(surface, Col.PG_CYAN,
+                         (hidden2_x + 20, mid_y),
+                         (out_pos[0] - 8, out_pos[1]), 2)
+
+    @classmethod
+    def layers_x(cls):
+        """Return x positions of input, hidden and output layers."""
+        input_x = cls.PANEL_X + 50
+        hidden1_x = input_x + cls.NN_LAYER_SPACING
+        hidden2_x = hidden1_x + cls.NN_LAYER_SPACING
+        return input_x, hidden1_x, hidden2_x, hidden2_x + cls.NN_LAYER_SPACING
+
+    @classmethod
+    def input_positions(cls):
+        """Return centers of the 20 input neurons."""
+        input_x = cls.layers_x()[0]
+        return [(input_x, cls.NN_Y + 60 + i * cls.NN_INPUT_SPACING)
+                for i in range(len(cls.CATEGORIES) * 4)]
+
+    @classmethod
+    def output_positions(cls):
+        """Return centers of the output neurons."""
+        output_x = cls.layers_x()[3]
+        start_y = cls.NN_Y + cls.NN_HEIGHT//2 - (cls.NN_HEIGHT // 6)
+        return [(output_x, start_y + i * (cls.NN_HEIGHT // 6))
+                for i in range(len(cls.DIRECTIONS))]
+
+    @classmethod
+    def state_rect(cls):
+        """Return the area of the state panel values."""
+        top = cls.STATE_PANEL_Y + 55
+        return pg.Rect(cls.PANEL_X + 80, top,
+                       cls.STATE_PANEL_WIDTH - 81,
+                       (len(cls.CATEGORIES) - 1) * cls.STATE_ROW_HEIGHT + 18)
+
+    @classmethod
+    def input_rect(cls):
+        """Return the area of the input neurons."""
+        positions = cls.input_positions()
+        x, top = positions[0]
+        return pg.Rect(x - 7, top - 7, 14, positions[-1][1] - top + 14)
+
+    @classmethod
+    def output_rect(cls):
+        """Return the area of the output neurons and Q-values."""
+        positions = cls.output_positions()
+        x, top = positions[0]
+        return pg.Rect(x - 9, top - 10,
+                       cls.PANEL_X + cls.NN_WIDTH - 1 - (x - 9),
+                       positions[-1][1] - top + 20)
+
     @classmethod
     def draw_neural_state(cls, surface, state, is_ai_control):
-        """Draw the complete state panel.
+        """Draw the values of the state panel.
 
         Args:
             `surface`: Pygame surface to draw on
             `state`: Current state vector
             `is_ai_control`: Whether AI is controlling the snake
         """
-        panel_x = WIDTH - MARGIN * 5
-        panel_y = 0
-
         # Only 0 values if player (AI brain off)
         if not is_ai_control:
             state = [0] * len(state)
 
-        cls.draw_panel_background(
-            surface, panel_x, panel_y,
-            cls.STATE_PANEL_WIDTH, cls.STATE_PANEL_HEIGHT,
-            "Snake State"
-        )
-
-        header_y = panel_y + 35
-        cls.draw_state_direction(surface, panel_x, header_y)
-
-        start_y = header_y + 20
-        for row, category in enumerate(cls.CATEGORIES):
+        start_y = cls.STATE_PANEL_Y + 55
+        for row in range(len(cls.CATEGORIES)):
             cls.draw_state_category(
-                surface, panel_x,
+                surface, cls.PANEL_X,
                 start_y + row * cls.STATE_ROW_HEIGHT,
-                row, category, state, is_ai_control
+                row, state, is_ai_control
             )
 
     @classmethod
-    def draw_input_layer(cls, surface, x, y, state, is_ai):
+    def draw_input_layer(cls, surface, state, is_ai):
         """Draw input layer neurons with activation values.
 
         Args:
             `surface`: Pygame surface to draw on
-            `x`, `y`: Starting position
             `state`: Input state values
             `is_ai`: Whether AI control is active
-
-        Returns:
-            `list`: List of neuron positions for drawing connections
         """
-        neurons = []
-        for i, value in enumerate(state):
-            pos_y = y + (i * cls.NN_INPUT_SPACING)
+        for i, (value, pos) in enumerate(zip(state, cls.input_positions())):
             category_index = i // 4
             color = (cls.get_gradient_color(value, category_index)
                      if is_ai else Col.PG_RED)
-            pg.draw.circle(surface, color, (x, pos_y), 6)
-            neurons.append((x + 2, pos_y))
-        return neurons
+            pg.draw.circle(surface, color, pos, 6)
 
     @classmethod
     def draw_hidden_layers(cls, surface, x, y, height):
@@ -212,17 +304,15 @@ class AIPanel:
         Returns:
             `int`: X position of last hidden layer
         """
-        font = pg.font.Font(None, 24)
-
         # First hidden layer
-        text = font.render("Hidden (128)", True, Col.PG_WHITE)
+        text = TextCache.render("Hidden (128)", 24, Col.PG_WHITE)
         text_rotate = pg.transform.rotate(text, -90)
         surface.blit(text_rotate,
                      text_rotate.get_rect(center=(x, y + height//2)))
 
         # Second hidden layer
         x2 = x + cls.NN_LAYER_SPACING
-        text = font.render("Hidden (64)", True, Col.PG_WHITE)
+        text = TextCache.render("Hidden (64)", 24, Col.PG_WHITE)
         text_rotate = pg.transform.rotate(text, -90)
         surface.blit(text_rotate,
                      text_rotate.get_rect(center=(x2, y + height//2)))
@@ -235,97 +325,29 @@ class AIPanel:
         return x2
 
     @classmethod
-    def draw_output_layer(cls, surface, x, y, height, values, is_ai):
+    def draw_output_layer(cls, surface, values, is_ai):
         """Draw output layer with Q-values.
 
         Args:
             `surface`: Pygame surface to draw on
-            `x`, `y`: Starting position
-            `height`: Available height
             `values`: Q-values for each action
             `is_ai`: Whether AI control is active
-
-        Returns:
-            `list`: List of output neuron positions
         """
-        small_font = pg.font.Font(None, 20)
-        output_start_y = y + height//2 - (height // 6)
-        neurons = []
-
         max_val = max(values) if values else 0
 
-        for i, (action, value) in enumerate(zip(cls.DIRECTIONS, values)):
-            pos_y = output_start_y + (i * (height // 6))
-
+        for action, value, (x, pos_y) in zip(cls.DIRECTIONS, values,
+                                             cls.output_positions()):
             # To protect from division by 0
             norm_val = value / max_val if max_val > 0 else 0
 
             color = (cls.get_gradient_color(norm_val, None)
                      if is_ai else Col.PG_RED)
             pg.draw.circle(surface, color, (x, pos_y), 8)
-            neurons.append((x, pos_y))
 
             text_color = Col.PG_WHITE
-            if value == max(values):
+            if value == max_val:
                 text_color = Col.PG_CYAN
-            text = small_font.render(f"{action}: {value:.2f}",
-                                     True,
-                                     text_color)
+            text = TextCache.render(f"{action}: {value:.2f}",
+                                    20,
+                                    text_color)
             surface.blit(text, text.get_rect(left=x + 15, centery=pos_y))
-
-        return neurons
-
-    @classmethod
-    def draw_neural_network(cls, surface, state, action_values, is_ai_control):
-        """Draw complete neural network visualization.
-
-        Args:
-            `surface`: Pygame surface to draw on
-            `state`: Current state vector for input layer
-            `action_values`: Q-values for output layer
-            `is_ai_control`: Whether AI is controlling the snake
-        """
-        nn_x = WIDTH - MARGIN * 5
-        nn_y = 220
-
-        if not is_ai_control:
-            action_values = [0] * len(action_values)
-
-        # Background and title
-        cls.draw_panel_background(
-            surface, nn_x, nn_y,
-            cls.NN_WIDTH, cls.NN_HEIGHT,
-            "Neural Network"
-        )
-
-        input_x = nn_x + 50
-        hidden1_x = input_x + cls.NN_LAYER_SPACING
-        input_neurons = cls.draw_input_layer(
-            surface, input_x, nn_y + 60,
-            state, is_ai_control
-        )
-        hidden2_x = cls.draw_hidden_layers(
-            surface, hidden1_x, nn_y,
-            cls.NN_HEIGHT
-        )
-        output_x = hidden2_x + cls.NN_LAYER_SPACING
-        output_neurons = cls.draw_output_layer(
-            surface, output_x, nn_y,
-            cls.NN_HEIGHT, action_values,
-            is_ai_control
-        )
-
-        # Lines
-        mid_y = nn_y + cls.NN_HEIGHT//2
-        for in_pos in input_neurons:
-            pg.draw.line(surface, Col.PG_CYAN, in_pos,
-                         (hidden1_x - 20, mid_y), 1)
-
-        pg.draw.line(surface, Col.PG_CYAN,
-                     (hidden1_x + 20, mid_y),
-                     (hidden2_x - 20, mid_y), 1)
-
-        for out_pos in output_neurons:
-            pg.draw.line(surface, Col.PG_CYAN,
-                         (hidden2_x + 20, mid_y),
-                         (out_pos[0] - 8, out_pos[1]), 2)
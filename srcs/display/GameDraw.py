@@ -1,9 +1,10 @@
 import pygame as pg
 from .Colors import Colors as Col
-from settings import CELL_SIZE, MARGIN, WIDTH, HEIGHT, MIN_AI_WIDTH, GRID_SIZE
-from ..agent.Interpreter import Interpreter
+from .TextCache import TextCache
+from settings import MARGIN, MIN_AI_WIDTH
+from ..game.GameConfig import GameConfig
 from ..game.GameState import GameState
-from ..agent.SnakeAgent import SnakeAgent
+from ..agent.StepRecord import StepRecord
 from .AIPanel import AIPanel
 
 
@@ -15,7 +16,50 @@ class GameDraw:
     - Snake, fruits and game elements
     - Stats and status information
     - Neural network visualization via AIPanel
+
+    The background, grid and static panel parts are rendered once on
+    the `background` layer. Texts and fonts come from `TextCache`.
+    Board and window sizes come from the `GameConfig` set by `configure`.
+
+    Implementation:
+        After a first full frame, only dirty rectangles are redrawn and
+        passed to `pg.display.update`:
+        - board cells whose content changed since last frame (tail,
+          head, eaten and spawned fruits)
+        - text and panel regions whose values changed
+
+        Each is restored from the background layer then drawn again,
+        clipped to its rectangle. `invalidate` forces a full frame.
     """
+    config = GameConfig()
+    background = None
+    cells = None  # {(y, x): kind} drawn on the screen
+    regions = {}  # {name: key of the values drawn on the screen}
+
+    # Board cell kinds: (color, rounded)
+    KINDS = {
+        "head": (Col.SNAKE_HEAD_COLOR, False),
+        "body": (Col.SNAKE_COLOR, False),
+        "green": (Col.GREEN_FRUIT_COLOR, True),
+        "red": (Col.RED_FRUIT_COLOR, True),
+    }
+    HEADER = pg.Rect(0, 0, config.width - MIN_AI_WIDTH, MARGIN)
+    FOOTER = pg.Rect(0, config.height - 80, config.width - MIN_AI_WIDTH, 80)
+
+    def configure(config: GameConfig) -> None:
+        """Lay the window out for `config` and redraw it next frame.
+
+        Args:
+            `config`: Game configuration, with board and cell sizes
+        """
+        GameDraw.config = config
+        board_width = config.width - MIN_AI_WIDTH
+        GameDraw.HEADER = pg.Rect(0, 0, board_width, MARGIN)
+        GameDraw.FOOTER = pg.Rect(0, config.height - 80, board_width, 80)
+        AIPanel.configure(config.width, config.height)
+        GameDraw.background = None
+        GameDraw.invalidate()
+
     @staticmethod
     def draw_game(surface: pg.Surface,
                   gameState: GameState,
@@ -23,7 +67,7 @@ class GameDraw:
                   green_fruits: list[list],
                   red_fruits: list[list],
                   episode: int,
-                  snakeAgent: SnakeAgent
+                  record: StepRecord
                   ) -> None:
         """Draw complete game state.
 
@@ -34,21 +78,135 @@ class GameDraw:
             `green_fruits`: Green fruit coordinates [[y,x],...]
             `red_fruits`: Red fruit coordinates [[y,x],...]
             `episode`: Current training episode number
-            `snakeAgent`: Agent for getting action values
+            `record`: Current step record, with its observation and
+                Q-values
         """
+        current_state = record.state
+        current_action_values = record.q_values
+        is_ai = gameState.is_ai_control
+        if not is_ai:
+            current_action_values = [0] * len(current_action_values)
 
-        current_state = Interpreter.get_state(snake, green_fruits, red_fruits)
-        current_action_values = snakeAgent.get_action_values(current_state)
+        cells = GameDraw.cell_kinds(snake, green_fruits, red_fruits)
+        regions = {
+            "header": (
+                GameDraw.HEADER,
+                (len(snake), episode, gameState.max_length, gameState.step),
+                lambda: GameDraw.draw_header(surface, gameState,
+                                             len(snake), episode)),
+            "footer": (
+                GameDraw.FOOTER,
+                (gameState.training, is_ai, gameState.step_by_step),
+                lambda: GameDraw.draw_footer(surface, gameState)),
+            "state": (
+                AIPanel.state_rect(),
+                (tuple(current_state), is_ai),
+                lambda: AIPanel.draw_neural_state(surface,
+                                                  current_state,
+                                                  is_ai)),
+            "inputs": (
+                AIPanel.input_rect(),
+                (tuple(current_state), is_ai),
+                lambda: AIPanel.draw_input_layer(surface,
+                                                 current_state,
+                                                 is_ai)),
+            "outputs": (
+                AIPanel.output_rect(),
+                (tuple(current_action_values), is_ai),
+                lambda: AIPanel.draw_output_layer(surface,
+                                                  current_action_values,
+                                                  is_ai)),
+        }
+
+        if (GameDraw.cells is None or GameDraw.background is None
+                or GameDraw.background.get_size() != surface.get_size()):
+            GameDraw.draw_background(surface)
+            for _, _, draw in regions.values():
+                draw()
+            for cell, kind in cells.items():
+                GameDraw.draw_cell(surface, cell, kind)
+            pg.display.flip()
+        else:
+            pg.display.update(GameDraw.draw_dirty(surface, cells, regions))
 
-        # Draw game features
-        surface.fill(Col.BG_COLOR)
-        GameDraw.draw_grid(surface)
-        GameDraw.draw_snake(surface, snake)
-        GameDraw.draw_fruits(surface, green_fruits, Col.GREEN_FRUIT_COLOR)
-        GameDraw.draw_fruits(surface, red_fruits, Col.RED_FRUIT_COLOR)
+        GameDraw.cells = cells
+        GameDraw.regions = {name: key
+                            for name, (_, key, _) in regions.items()}
 
-        # Draw stats
-        GameDraw.draw_length(surface, len(snake))
+    def draw_dirty(surface: pg.Surface,
+                   cells: dict[tuple, str],
+                   regions: dict[str, tuple]
+                   ) -> list[pg.Rect]:
+        """Redraw what changed since last frame.
+
+        Args:
+            `surface`: Pygame surface to draw on
+            `cells`: Occupied cells from `cell_kinds`
+            `regions`: {name: (rect, key, draw function)}
+
+        Returns:
+            `list`: Dirty rectangles to update on the display
+        """
+        dirty = []
+        for cell in GameDraw.cells.keys() | cells.keys():
+            kind = cells.get(cell)
+            if GameDraw.cells.get(cell) != kind:
+                rect = GameDraw.cell_rect(cell)
+                GameDraw.restore(surface, rect)
+                if kind:
+                    GameDraw.draw_cell(surface, cell, kind)
+                dirty.append(rect)
+
+        # A head out of the board overlaps the texts around it: regions
+        # it touched are redrawn, and cells are drawn over regions
+        redrawn = []
+        for name, (rect, key, draw) in regions.items():
+            if (GameDraw.regions.get(name) != key
+                    or rect.collidelist(dirty) != -1):
+                GameDraw.restore(surface, rect)
+                surface.set_clip(rect)
+                draw()
+                surface.set_clip(None)
+                redrawn.append(rect)
+        for cell, kind in cells.items():
+            if GameDraw.cell_rect(cell).collidelist(redrawn) != -1:
+                GameDraw.draw_cell(surface, cell, kind)
+        return dirty + redrawn
+
+    def invalidate() -> None:
+        """Redraw the whole window on next frame."""
+        GameDraw.cells = None
+
+    def draw_background(surface: pg.Surface) -> None:
+        """Blit the static layer, rendering it on first use.
+
+        Args:
+            `surface`: Pygame surface to draw on
+        """
+        if (GameDraw.background is None
+                or GameDraw.background.get_size() != surface.get_size()):
+            background = pg.Surface(surface.get_size()).convert()
+            background.fill(Col.BG_COLOR)
+            GameDraw.draw_grid(background)
+            GameDraw.draw_stat(background,
+                               "[S] Save model",
+                               '',
+                               GameDraw.FOOTER.top)
+            AIPanel.draw_static(background)
+            GameDraw.background = background
+        surface.blit(GameDraw.background, (0, 0))
+
+    def restore(surface: pg.Surface, rect: pg.Rect) -> None:
+        """Copy the background layer back over `rect`."""
+        surface.blit(GameDraw.background, rect, rect)
+
+    def draw_header(surface: pg.Surface,
+                    gameState: GameState,
+                    length: int,
+                    episode: int
+                    ) -> None:
+        """Draw snake length and episode stats above the board."""
+        GameDraw.draw_length(surface, length)
         GameDraw.draw_stat(surface,
                            "Episode",
                            episode,
@@ -62,23 +220,20 @@ class GameDraw:
                            gameState.step,
                            50)
 
-        # Draw status
+    def draw_footer(surface: pg.Surface, gameState: GameState) -> None:
+        """Draw status and instructions below the board."""
         GameDraw.draw_stat(surface,
                            "Training:",
                            gameState.training,
-                           HEIGHT - 20)
+                           GameDraw.FOOTER.top + 60)
         GameDraw.draw_stat(surface,
                            "[A] AI:",
                            gameState.is_ai_control,
-                           HEIGHT - 40)
+                           GameDraw.FOOTER.top + 40)
         GameDraw.draw_stat(surface,
                            "[P] Step-by-step:",
                            gameState.step_by_step,
-                           HEIGHT - 60)
-        GameDraw.draw_stat(surface,
-                           "[S] Save model",
-                           '',
-                           HEIGHT - 80)
+                           GameDraw.FOOTER.top + 20)
 
         # Draw instructions
         if gameState.is_ai_control and gameState.step_by_step:
@@ -86,71 +241,68 @@ class GameDraw:
         elif not gameState.is_ai_control:
             GameDraw.draw_info(surface, "Use ARROWS to move")
 
-        # Draw neural network and state
-        AIPanel.draw_neural_state(surface,
-                                  current_state,
-                                  gameState.is_ai_control)
-        AIPanel.draw_neural_network(surface,
-                                    current_state,
-                                    current_action_values,
-                                    gameState.is_ai_control)
-
-        pg.display.flip()
-
     def draw_grid(surface: pg.Surface) -> None:
         """Draw game grid.
 
         Args:
             `surface`: Pygame surface to draw on
         """
-        for row in range(GRID_SIZE):
-            for column in range(GRID_SIZE):
+        grid_size = GameDraw.config.grid_size
+        for row in range(grid_size):
+            for column in range(grid_size):
                 if (row + column) % 2:
                     color = Col.GRID_COLOR_EVEN
                 else:
                     color = Col.GRID_COLOR_ODD
-                pg.draw.rect(surface, color, pg.Rect(
-                    column * CELL_SIZE + MARGIN,
-                    row * CELL_SIZE + MARGIN,
-                    CELL_SIZE, CELL_SIZE))
+                pg.draw.rect(surface, color,
+                             GameDraw.cell_rect((row, column)))
 
-    def draw_snake(surface: pg.Surface, snake: list[list]) -> None:
-        """Draw snake with different colored head.
+    def cell_kinds(snake: list[list],
+                   green_fruits: list[list],
+                   red_fruits: list[list]
+                   ) -> dict[tuple, str]:
+        """Map occupied cells to their kind, in drawing order.
 
         Args:
-            `surface`: Pygame surface to draw on
-            `snake`: Snake body coordinates [[y,x],...]
+            `snake`: Snake body coordinates [[y,x],...], head first
+            `green_fruits`: Green fruit coordinates [[y,x],...]
+            `red_fruits`: Red fruit coordinates [[y,x],...]
+
+        Returns:
+            `dict`: {(y, x): "head" | "body" | "green" | "red"}
         """
+        cells = {}
         for i, part in enumerate(snake):
-            color = Col.SNAKE_HEAD_COLOR if i == 0 else Col.SNAKE_COLOR
-            pg.draw.rect(surface, color, pg.Rect(
-                part[1] * CELL_SIZE + MARGIN,
-                part[0] * CELL_SIZE + MARGIN,
-                CELL_SIZE,
-                CELL_SIZE))
-
-    def draw_fruits(surface: pg.Surface,
-                    fruits: list[list],
-                    color: tuple
-                    ) -> None:
-        """Draw fruits with rounded rectangles.
+            cells[tuple(part)] = "body" if i else "head"
+        for fruit in green_fruits:
+            cells[tuple(fruit)] = "green"
+        for fruit in red_fruits:
+            cells[tuple(fruit)] = "red"
+        return cells
+
+    def cell_rect(cell: tuple) -> pg.Rect:
+        """Screen rectangle of a board cell (y, x)."""
+        cell_size = GameDraw.config.cell_size
+        return pg.Rect(cell[1] * cell_size + MARGIN,
+                       cell[0] * cell_size + MARGIN,
+                       cell_size,
+                       cell_size)
+
+    def draw_cell(surface: pg.Surface, cell: tuple, kind: str) -> None:
+        """Draw a snake part (square) or a fruit (rounded rectangle).
 
         Args:
             `surface`: Pygame surface to draw on
-            `fruits`: Fruit coordinates [[y,x],...]
-            `color`: RGB color tuple for fruits
+            `cell`: Board coordinates (y, x)
+            `kind`: Cell kind, key of `KINDS`
         """
-        for fruit in fruits:
-            pg.draw.rect(
-                surface,
-                color,
-                pg.Rect(
-                    fruit[1] * CELL_SIZE + MARGIN,
-                    fruit[0] * CELL_SIZE + MARGIN,
-                    CELL_SIZE,
-                    CELL_SIZE),
-                border_radius=50,
-                border_top_left_radius=10)
+        color, rounded = GameDraw.KINDS[kind]
+        if rounded:
+            pg.draw.rect(surface, color, GameDraw.cell_rect(cell),
+                         border_radius=50,
+                         border_top_left_radius=10)
+        else:
+            pg.draw.rect(surface, color, GameDraw.cell_rect(cell))
 
     def draw_length(surface: pg.Surface, length: int) -> None:
         """Draw current snake length.
@@ -159,12 +311,10 @@ class GameDraw:
             `surface`: Pygame surface to draw on
             `length`: Current snake length
         """
-        font = pg.font.Font(None, 36)
-
-        length_text = font.render(f"Length: {length}",
-                                  True,
-                                  Col.PG_CYAN)
-        length_rect = length_text.get_rect(center=((WIDTH - MIN_AI_WIDTH) // 2,
+        length_text = TextCache.render(f"Length: {length}",
+                                       36,
+                                       Col.PG_CYAN)
+        length_rect = length_text.get_rect(center=(GameDraw.HEADER.centerx,
                                                    MARGIN // 2))
         surface.blit(length_text, length_rect)
 
@@ -175,14 +325,12 @@ class GameDraw:
             `surface`: Pygame surface to draw on
             `info`: Information text to display
         """
-        font = pg.font.Font(None, 26)
-
-        length_text = font.render(f"{info}",
-                                  True,
-                                  Col.PG_WHITE)
+        length_text = TextCache.render(f"{info}",
+                                       26,
+                                       Col.PG_WHITE)
         length_rect = length_text.get_rect(
-            center=((WIDTH - MIN_AI_WIDTH) // 2, MARGIN // 2),
-            top=(HEIGHT - 40),
+            center=(GameDraw.HEADER.centerx, MARGIN // 2),
+            top=(GameDraw.FOOTER.top + 40),
             )
         surface.blit(length_text, length_rect)
 
@@ -199,9 +347,7 @@ class GameDraw:
             `value`: Value to display
             `top`: Vertical position
         """
-        font = pg.font.Font(None, 24)
-
-        key_text = font.render(f"{key} ", True, Col.PG_WHITE)
+        key_text = TextCache.render(f"{key} ", 24, Col.PG_WHITE)
 
         if isinstance(value, bool):
             status_text = "ON" if value else "OFF"
@@ -209,7 +355,7 @@ class GameDraw:
         else:
             status_text = str(value)
             status_color = Col.PG_CYAN
-        value_text = font.render(status_text, True, status_color)
+        value_text = TextCache.render(status_text, 24, status_color)
 
         key_rect = key_text.get_rect(top=top, left=5)
         value_rect = value_text.get_rect(top=top, left=key_rect.right)
@@ -0,0 +1,159 @@
+import multiprocessing as mp
+import os
+import queue
+import numpy as np
+
+
+class MetricsReader:
+    """Incremental reader of a `MetricsLog` CSV file.
+
+    Each `update` parses only the complete rows appended since the last
+    call, so refreshing a plot does not re-read the whole history.
+
+    Args:
+        `path`: CSV file written by `MetricsLog`
+    """
+    COLUMNS = ("episode", "length", "record", "loss")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.header = None
+        self.columns = {name: [] for name in self.COLUMNS}
+
+    def update(self) -> int:
+        """Read new complete rows and return how many were read."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as file:
+            file.seek(self.offset)
+            data = file.read()
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+
+        rows = 0
+        for line in data[:end].decode().splitlines():
+            cells = line.split(",")
+            if self.header is None:
+                self.header = {name: cells.index(name)
+                               for name in self.COLUMNS}
+                continue
+            for name, index in self.header.items():
+                value = cells[index]
+                self.columns[name].append(float(value) if value else np.nan)
+            rows += 1
+        return rows
+
+    def array(self, name: str) -> np.ndarray:
+        return np.asarray(self.columns[name], dtype=np.float64)
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of each run of `window` consecutive values."""
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums[window - 1:] / window
+
+
+def plot_metrics(reader: MetricsReader,
+                 plot_path: str,
+                 window: int = 20
+                 ) -> None:
+    """Save length, record and loss curves of the rows read so far.
+
+    Args:
+        `reader`: Reader of the metrics log
+        `plot_path`: Image file to write
+        `window`: Episodes of the length moving mean
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    directory = os.path.dirname(plot_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    episodes = reader.array("episode")
+    lengths = reader.array("length")
+    loss = reader.array("loss")
+
+    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 11))
+
+    # Plot raw episode lengths with some transparency
+    ax1.plot(episodes, lengths, label='Length per episode', alpha=0.3)
+    if len(lengths) >= window:
+        ax1.plot(episodes[window - 1:],
+                 moving_average(lengths, window),
+                 label=f'Moving mean ({window} episodes)',
+                 linewidth=2)
+    ax1.set_title('Snake length evolution')
+    ax1.set_xlabel('Episode')
+    ax1.set_ylabel('Length')
+    ax1.legend()
+
+    ax2.plot(episodes, reader.array("record"),
+             label='Record evolution', color='red')
+    ax2.set_title('Record evolution')
+    ax2.set_xlabel('Episode')
+    ax2.set_ylabel('Record')
+    ax2.legend()
+
+    known = ~np.isnan(loss)
+    ax3.plot(episodes[known], loss[known],
+             label='Mean loss per episode', color='purple')
+    ax3.set_title('Training loss')
+    ax3.set_xlabel('Episode')
+    ax3.set_ylabel('Loss')
+    if known.any():
+        ax3.set_yscale('log')
+        ax3.legend()
+
+    plt.tight_layout()
+    plt.savefig(plot_path)
+    plt.close(fig)
+
+
+def run_plotter(log_path: str, plot_path: str, requests) -> None:
+    """Plotter process: redraw the plot on each request until None."""
+    reader = MetricsReader(log_path)
+    while True:
+        request = requests.get()
+        reader.update()
+        if reader.columns["episode"]:
+            plot_metrics(reader, plot_path)
+        if request is None:
+            return
+
+
+class BackgroundPlotter:
+    """Regenerate plots of a metrics log in a separate process.
+
+    `request` only posts a message, so the training loop never waits
+    for matplotlib. Requests arriving while a plot is being drawn are
+    merged into one.
+
+    Args:
+        `log_path`: CSV file written by `MetricsLog`
+        `plot_path`: Image file to write
+    """
+    def __init__(self, log_path: str, plot_path: str):
+        ctx = mp.get_context("spawn")
+        self.requests = ctx.Queue(maxsize=1)
+        self.process = ctx.Process(target=run_plotter,
+                                   args=(log_path, plot_path,
+                                         self.requests),
+                                   daemon=True)
+        self.process.start()
+
+    def request(self) -> None:
+        """Ask for a new plot, unless one is already pending."""
+        try:
+            self.requests.put_nowait(True)
+        except queue.Full:
+            pass
+
+    def close(self) -> None:
+        """Draw a final plot and wait for the process to finish."""
+        self.requests.put(None)
+        self.process.join()
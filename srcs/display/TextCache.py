@@ -0,0 +1,47 @@
+from collections import OrderedDict
+import pygame as pg
+
+
+class TextCache:
+    """Shared cache of fonts and rendered text surfaces.
+
+    Fonts are loaded once per size. Rendered texts are kept by
+    (text, size, color) in a bounded LRU, so labels that never change
+    are rendered once and counters only cost a render when they change.
+    """
+    MAX_TEXTS = 1024
+
+    fonts = {}
+    texts = OrderedDict()
+
+    @classmethod
+    def font(cls, size: int) -> pg.font.Font:
+        """Return the default font at `size`, loading it once."""
+        font = cls.fonts.get(size)
+        if font is None:
+            font = cls.fonts[size] = pg.font.Font(None, size)
+        return font
+
+    @classmethod
+    def render(cls, text: str, size: int, color) -> pg.Surface:
+        """Return antialiased `text` rendered at `size` in `color`.
+
+        Args:
+            `text`: Text to render
+            `size`: Font size
+            `color`: Text color (pg.Color or RGB tuple)
+
+        Returns:
+            `pg.Surface`: Cached surface, must not be drawn on
+        """
+        key = (text, size, tuple(color))
+        surface = cls.texts.get(key)
+        if surface is not None:
+            cls.texts.move_to_end(key)
+            return surface
+
+        surface = cls.font(size).render(text, True, color)
+        cls.texts[key] = surface
+        if len(cls.texts) > cls.MAX_TEXTS:
+            cls.texts.popitem(last=False)
+        return surface
@@ -27,9 +27,14 @@ def print_state(state):
     print(Col.END)
 
 
-def print_experience(state, action, reward, done):
+def print_experience(record):
     """Print all parameters from step Q(s,a) to Q(s',a')."""
+    state, action, reward, done = (record.state, record.action,
+                                   record.reward, record.done)
     print_state(state)
+    if record.q_values is not None:
+        q_values = ", ".join(f"{value:.2f}" for value in record.q_values)
+        print(f"{Col.BOLD}Q-values: [{q_values}]{Col.END}")
     actions = {0: "UP", 1: "DOWN", 2: "LEFT", 3: "RIGHT"}
     print(Col.BOLD, end="")
     print(f"Action: {Col.GREEN}{actions[action]}{Col.END}", end="")
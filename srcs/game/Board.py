@@ -0,0 +1,128 @@
+import random
+
+
+class Board:
+    """Occupancy grid of the snake body and fruits.
+
+    Args:
+        `grid_size`: Number of cells on each side of the board
+
+    Implementation:
+        The board is padded with one wall cell on each side and packed row
+        by row, so a cell is `(y + 1) * stride + (x + 1)` and a head that
+        just left the board still has an index:
+        - cells[stride**2]: EMPTY, GREEN, RED or WALL code of each cell
+        - body[stride**2]: number of snake segments on each cell
+        - free[n]: packed indices of cells without snake nor fruit
+        - free_pos[stride**2]: position of each cell in `free`, or -1
+
+        All arrays are updated on each move, so any probe is O(1). Cells
+        leave `free` by swapping with its last entry, which keeps drawing
+        a random empty cell O(1) as well.
+    """
+    EMPTY = 0
+    GREEN = 1
+    RED = 2
+    WALL = 3
+
+    def __init__(self, grid_size: int):
+        self.grid_size = grid_size
+        self.stride = grid_size + 2
+        # Packed offsets of directions [up,down,left,right]
+        self.steps = (-self.stride, self.stride, -1, 1)
+
+        walls = bytearray([self.WALL]) * self.stride
+        row = bytes([self.WALL]) + bytes(grid_size) + bytes([self.WALL])
+        self.empty_cells = bytes(walls + row * grid_size + walls)
+        self.all_free = [index for index, cell in enumerate(self.empty_cells)
+                         if cell == self.EMPTY]
+        self.all_free_pos = [-1] * len(self.empty_cells)
+        for position, index in enumerate(self.all_free):
+            self.all_free_pos[index] = position
+        self.clear()
+
+    @classmethod
+    def from_lists(cls,
+                   snake: list[list],
+                   green_fruits: list[list],
+                   red_fruits: list[list],
+                   grid_size: int
+                   ) -> "Board":
+        """Build a board from coordinate lists [[y,x], ...]."""
+        board = cls(grid_size)
+        for y, x in snake:
+            board.add_body(y, x)
+        for y, x in green_fruits:
+            board.add_fruit(y, x, cls.GREEN)
+        for y, x in red_fruits:
+            board.add_fruit(y, x, cls.RED)
+        return board
+
+    def clear(self) -> None:
+        """Remove snake and fruits from the board."""
+        self.cells = bytearray(self.empty_cells)
+        self.body = bytearray(len(self.empty_cells))
+        self.free = list(self.all_free)
+        self.free_pos = list(self.all_free_pos)
+
+    def pack(self, y: int, x: int) -> int:
+        """Return packed index of cell [y,x]."""
+        return (y + 1) * self.stride + x + 1
+
+    def unpack(self, index: int) -> list[int]:
+        """Return [y,x] coordinates of packed index."""
+        y, x = divmod(index, self.stride)
+        return [y - 1, x - 1]
+
+    def occupy(self, index: int) -> None:
+        """Remove packed cell from the free cells, if it is there."""
+        position = self.free_pos[index]
+        if position < 0:
+            return
+        last = self.free.pop()
+        if last != index:
+            self.free[position] = last
+            self.free_pos[last] = position
+        self.free_pos[index] = -1
+
+    def release(self, index: int) -> None:
+        """Add packed cell back to the free cells if nothing is on it."""
+        if (self.cells[index] == self.EMPTY and not self.body[index]
+                and self.free_pos[index] < 0):
+            self.free_pos[index] = len(self.free)
+            self.free.append(index)
+
+    def add_body(self, y: int, x: int) -> None:
+        """Add a snake segment on cell [y,x]."""
+        index = self.pack(y, x)
+        self.body[index] += 1
+        self.occupy(index)
+
+    def remove_body(self, y: int, x: int) -> None:
+        """Remove a snake segment from cell [y,x]."""
+        index = self.pack(y, x)
+        self.body[index] -= 1
+        self.release(index)
+
+    def add_fruit(self, y: int, x: int, kind: int) -> None:
+        """Put a fruit of `kind` (GREEN or RED) on cell [y,x]."""
+        index = self.pack(y, x)
+        self.cells[index] = kind
+        self.occupy(index)
+
+    def remove_fruit(self, y: int, x: int) -> None:
+        """Remove the fruit on cell [y,x]."""
+        index = self.pack(y, x)
+        self.cells[index] = self.EMPTY
+        self.release(index)
+
+    def random_free_cell(self, rng: random.Random = random
+                         ) -> list[int] | None:
+        """Return uniformly drawn empty cell [y,x], None if board is full.
+
+        Args:
+            `rng`: Random generator to draw with, `random` module default
+        """
+        if not self.free:
+            return None
+        return self.unpack(self.free[rng.randrange(len(self.free))])
@@ -0,0 +1,78 @@
+from array import array
+import numpy as np
+from settings import GRID_SIZE
+
+
+class EpisodeStats:
+    """Streaming statistics of episode lengths.
+
+    Args:
+        `window`: Number of last episodes of the running mean
+        `cells`: Number of cells of the board, the longest possible snake
+
+    Implementation:
+        Lengths are appended to a typed `array` (2 bytes per episode on
+        boards of less than 65536 cells, 4 bytes above). Everything printed
+        during a run is updated in O(1) per episode:
+        - running sum of the last `window` lengths
+        - best length so far
+        - histogram of lengths, from which quantiles are read in
+          O(max length) without sorting
+
+        Plots are drawn from the metrics log by the `Plotter`, not from
+        these statistics.
+    """
+    def __init__(self, window: int = 100, cells: int = GRID_SIZE ** 2):
+        self.window = window
+        self.typecode = "H" if cells < 2 ** 16 else "I"
+        self.lengths = array(self.typecode)
+        self.histogram = array("Q")
+        self.window_sum = 0
+        self.max_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, length: int) -> None:
+        """Record the final length of an episode."""
+        lengths = self.lengths
+        lengths.append(length)
+        self.window_sum += length
+        if len(lengths) > self.window:
+            self.window_sum -= lengths[-self.window - 1]
+        if length > self.max_length:
+            self.max_length = length
+        if length >= len(self.histogram):
+            self.histogram.extend([0] * (length + 1 - len(self.histogram)))
+        self.histogram[length] += 1
+
+    def recent_mean(self) -> float:
+        """Mean length of the last `window` episodes."""
+        n = min(len(self.lengths), self.window)
+        return self.window_sum / n if n else 0.0
+
+    def quantile(self, q: float) -> int:
+        """Length at quantile `q` (nearest rank) of all episodes."""
+        rank = max(1, int(np.ceil(q * len(self.lengths))))
+        seen = 0
+        for length, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return length
+        return 0
+
+    def values(self) -> np.ndarray:
+        """Copy of all episode lengths as a numpy array."""
+        return np.frombuffer(self.lengths, dtype=self.typecode).copy()
+
+    def state_dict(self) -> dict:
+        """Return lengths to save in a training checkpoint."""
+        return {"lengths": self.lengths}
+
+    def load_state_dict(self, state: dict) -> None:
+        """Restore lengths saved by `state_dict` and rebuild the rest."""
+        self.lengths = array(self.typecode, state["lengths"])
+        values = self.values()
+        self.window_sum = int(values[-self.window:].sum())
+        self.max_length = int(values.max()) if len(values) else 0
+        self.histogram = array("Q", np.bincount(values).tolist())
@@ -1,6 +1,7 @@
 import pygame as pg
 from ..agent.SnakeAgent import SnakeAgent
 from .GameState import GameState
+from ..display.GameDraw import GameDraw
 from typing import Callable
 
 
@@ -12,6 +13,7 @@ class EventHandler:
     - AI/manual control toggling
     - Model saving
     - Movement in manual mode
+    - Full redraws when the window is exposed
     """
     @staticmethod
     def handle_event(event: pg.event.Event,
@@ -21,6 +23,8 @@ class EventHandler:
                      ) -> tuple[bool, str | None]:
         if event.type == pg.QUIT:
             return True, None
+        if event.type == pg.WINDOWEXPOSED:
+            GameDraw.invalidate()
         move_keys = (pg.K_UP, pg.K_DOWN, pg.K_LEFT, pg.K_RIGHT)
         if event.type == pg.KEYDOWN:
             match event.key:
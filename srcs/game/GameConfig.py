@@ -0,0 +1,74 @@
+from settings import GRID_SIZE, CELL_SIZE, MAX_GAME_SIZE, MARGIN, \
+                     MIN_AI_WIDTH, MIN_GAME_HEIGHT, SNAKE_SIZE, \
+                     GREEN_FRUITS_NB, RED_FRUITS_NB, \
+                     R_COLLISION, R_GREEN_FRUIT, R_RED_FRUIT, R_WIN
+
+
+class GameConfig:
+    """Board size, population, rewards and layout of a game.
+
+    Defaults come from `settings.py`. One instance is built from the
+    command line and passed to the environments, the interpreter and
+    the renderer, so a board size is chosen at runtime instead of at
+    import.
+
+    Args:
+        `grid_size`: Number of cells on each side of the board
+        `snake_size`: Initial snake length
+        `green_fruits`: Number of green fruits on the board
+        `red_fruits`: Number of red fruits on the board
+        `rewards`: (collision, green fruit, red fruit, win) rewards
+        `cell_size`: Cell side in pixels, by default `CELL_SIZE` shrunk
+            so the board fits in `MAX_GAME_SIZE` pixels
+    """
+    def __init__(self,
+                 grid_size: int = GRID_SIZE,
+                 snake_size: int = SNAKE_SIZE,
+                 green_fruits: int = GREEN_FRUITS_NB,
+                 red_fruits: int = RED_FRUITS_NB,
+                 rewards: tuple = (R_COLLISION, R_GREEN_FRUIT,
+                                   R_RED_FRUIT, R_WIN),
+                 cell_size: int | None = None):
+        self.grid_size = grid_size
+        self.snake_size = snake_size
+        self.green_fruits = green_fruits
+        self.red_fruits = red_fruits
+        (self.r_collision, self.r_green_fruit,
+         self.r_red_fruit, self.r_win) = rewards
+        if cell_size is None:
+            cell_size = max(1, min(CELL_SIZE, MAX_GAME_SIZE // grid_size))
+        self.cell_size = cell_size
+        self.validate()
+
+    def validate(self) -> None:
+        """Raise AssertionError if no game can be played."""
+        if self.grid_size < 1 or self.cell_size < 1:
+            raise AssertionError("Grid and cell size must be > 0")
+        if self.snake_size < 1 or self.green_fruits < 0 \
+                or self.red_fruits < 0:
+            raise AssertionError("Snake size must be > 0 and fruits >= 0")
+        if self.snake_size > self.grid_size:
+            raise AssertionError("Snake can't be greater than grid size")
+        if (self.green_fruits + self.red_fruits
+                >= self.cells - self.snake_size):
+            raise AssertionError("Not enough place to spawn fruits")
+
+    @property
+    def cells(self) -> int:
+        """Number of cells of the board."""
+        return self.grid_size ** 2
+
+    @property
+    def game_size(self) -> int:
+        """Board side in pixels."""
+        return self.grid_size * self.cell_size
+
+    @property
+    def width(self) -> int:
+        """Window width: board, margins and AI panel."""
+        return MARGIN + self.game_size + MARGIN + MIN_AI_WIDTH
+
+    @property
+    def height(self) -> int:
+        """Window height: board and margins."""
+        return max(MIN_GAME_HEIGHT, MARGIN + self.game_size + MARGIN)
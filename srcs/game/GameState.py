@@ -1,8 +1,6 @@
 from ..display.Colors import Colors as Col
+from .EpisodeStats import EpisodeStats
 from datetime import datetime
-import numpy as np
-import matplotlib.pyplot as plt
-import os
 
 
 class GameState:
@@ -15,6 +13,7 @@ class GameState:
         `visual`: Whether to show game visualization "on"/"off"
         `debug`: Whether to show debug information
         `training`: Whether agent is in training mode
+        `cells`: Number of cells of the board, default from settings
     """
     def __init__(self,
                  is_ai_control: bool,
@@ -22,7 +21,8 @@ class GameState:
                  episode_nb: int,
                  visual: str,
                  debug: bool,
-                 training: bool
+                 training: bool,
+                 cells: int | None = None
                  ) -> None:
         """Initialize game state with control settings."""
         self.is_ai_control = is_ai_control
@@ -32,15 +32,14 @@ class GameState:
 
         self.gameover = False
         self.step = 0
-        self.max_length = 0
         self.training = training
         self.debug = debug
 
-        self.episode_lengths = []
-        self.records = []
+        self.stats = (EpisodeStats(cells=cells) if cells
+                      else EpisodeStats())
         self.total_episodes = 0
-        self.moving_avg_window = 20
         self.start_time = datetime.now()
+        self.metrics = None
 
         if self.debug:
             self.print_initial_debug()
@@ -58,93 +57,66 @@ class GameState:
             status = Col.GREEN + 'ON' if val else Col.RED + 'OFF'
             print(f"{Col.CYAN}{Col.BOLD}{key}: {status}{Col.END}")
 
-    def update(self, snake_len: int, epsilon: float) -> None:
+    def update(self,
+               snake_len: int,
+               epsilon: float,
+               steps: int | None = None,
+               cause: str | None = None,
+               loss: float | None = None
+               ) -> None:
         """Update state for new episode.
 
         Args:
             `snake_len`: Current snake length to update max length
             `epsilon`: Current e-greedy value of snake agent
+            `steps`: Steps played in the episode, for the metrics log
+            `cause`: Game over cause, for the metrics log
+            `loss`: Mean training loss, for the metrics log
         """
         self.total_episodes += 1
-        self.episode_lengths.append(snake_len)
+        self.stats.add(snake_len)
         self.agent_epsilon = epsilon
-
-        if snake_len > self.max_length:
-            self.max_length = snake_len
-        self.records.append(self.max_length)
+        if self.metrics:
+            self.metrics.write(self.total_episodes, snake_len,
+                               self.max_length, epsilon,
+                               steps, cause, loss)
 
         self.step = 0
         self.gameover = False
 
+    @property
+    def max_length(self) -> int:
+        """Best episode length so far."""
+        return self.stats.max_length
+
+    def state_dict(self) -> dict:
+        """Return episode statistics to save in a training checkpoint."""
+        return {
+            "stats": self.stats.state_dict(),
+            "total_episodes": self.total_episodes,
+        }
+
+    def load_state_dict(self, state: dict) -> None:
+        """Restore episode statistics saved by `state_dict`."""
+        self.stats.load_state_dict(state["stats"])
+        self.total_episodes = state["total_episodes"]
+
     def print_periodic_stats(self, print_frequency: int) -> None:
         """Display periodic statistics about the snake performance."""
-        if self.episode_lengths:
-            avg_length = np.mean(self.episode_lengths[-100:])
-        else:
-            avg_length = 0
+        avg_length = self.stats.recent_mean()
         elapsed_time = datetime.now() - self.start_time
 
         print(f"\n=== Episode stats {self.total_episodes} ===")
         print(f"Time elapsed: {elapsed_time}")
         print(f"Mean Length ({print_frequency} last): {avg_length:.2f}")
+        if len(self.stats):
+            print(f"Length Median/P95: {self.stats.quantile(0.5)}"
+                  f"/{self.stats.quantile(0.95)}")
         print(f"Length Record: {self.max_length}")
         if hasattr(self, "agent_epsilon"):
             print(f"Agent Epsilon: {self.agent_epsilon:.3f}")
         print("=====================================\n")
 
-    def plot_statistics(self, plot_path: str) -> None:
-        """Generate and save visualization plots of game statistics."""
-        if not plot_path:
-            return
-
-        path = os.path.join("plot", plot_path)
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
-
-        # x-axis values for all episodes
-        episodes = range(len(self.episode_lengths))
-
-        # Plot raw episode lengths with some transparency
-        ax1.plot(episodes,
-                 self.episode_lengths,
-                 label='Length per episode',
-                 alpha=0.3)
-
-        if len(self.episode_lengths) >= self.moving_avg_window:
-            moving_avg = self.calculate_moving_average()
-
-            ax1.plot(episodes[self.moving_avg_window-1:],
-                     moving_avg,
-                     label=f'Moving mean ({self.moving_avg_window} episodes)',
-                     linewidth=2)
-
-        # subplot 1
-        ax1.set_title('Snake length evolution')
-        ax1.set_xlabel('Episode')
-        ax1.set_ylabel('Length')
-        ax1.legend()
-
-        # subplot 2
-        ax2.plot(episodes, self.records, label='Record evolution', color='red')
-        ax2.set_title('Record evolution')
-        ax2.set_xlabel('Episode')
-        ax2.set_ylabel('Record')
-        ax2.legend()
-
-        plt.tight_layout()
-        plt.savefig(path)
-        plt.close()
-
-    def calculate_moving_average(self) -> list:
-        """Calculate the moving average of episode lengths."""
-        result = []
-        for i in range(self.moving_avg_window, len(self.episode_lengths) + 1):
-            window = self.episode_lengths[i - self.moving_avg_window:i]
-            window_average = np.mean(window)
-            result.append(window_average)
-        return result
-
     def toggle_ai(self) -> None:
         """Toggle AI control mode and print debug info."""
         self.is_ai_control = not self.is_ai_control
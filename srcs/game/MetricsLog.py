@@ -0,0 +1,56 @@
+import csv
+import os
+
+
+class MetricsLog:
+    """Append-only CSV log with one row of metrics per episode.
+
+    Args:
+        `path`: CSV file path
+        `append`: Whether to continue an existing log (resumed training)
+            instead of starting a new one
+
+    Rows are buffered by the file object and only flushed by `flush`, so
+    writing one costs no system call. Empty cells mean the value is not
+    known (no gradient step yet, or not reported by parallel actors).
+    """
+    FIELDS = ("episode", "length", "record", "epsilon",
+              "steps", "cause", "loss")
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new = not append or not os.path.exists(path)
+        self.file = open(path, "w" if new else "a", newline="")
+        self.writer = csv.writer(self.file)
+        if new:
+            self.writer.writerow(self.FIELDS)
+
+    def write(self,
+              episode: int,
+              length: int,
+              record: int,
+              epsilon: float,
+              steps: int | None = None,
+              cause: str | None = None,
+              loss: float | None = None
+              ) -> None:
+        """Append the metrics of one episode."""
+        self.writer.writerow((
+            episode,
+            length,
+            record,
+            f"{epsilon:.4f}",
+            "" if steps is None else steps,
+            cause or "",
+            "" if loss is None else f"{loss:.6g}",
+        ))
+
+    def flush(self) -> None:
+        """Write buffered rows to the file."""
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
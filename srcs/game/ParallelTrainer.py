@@ -0,0 +1,232 @@
+import os
+import queue
+import time
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from .GameConfig import GameConfig
+from .Profiler import Profiler
+from .SnakeGame import SnakeGame
+from .VecSnakeEnv import VecSnakeEnv
+from ..agent.Memory import Memory
+from ..agent.NumpyQNetwork import NumpyQNetwork
+
+COLLECT = Profiler.phase("collect_episodes")
+WAIT = Profiler.phase("wait_actors")
+PUBLISH = Profiler.phase("publish_weights")
+
+
+def epsilon_greedy(network: NumpyQNetwork,
+                   states: np.ndarray,
+                   epsilon: float
+                   ) -> np.ndarray:
+    """Select one action per state like `SnakeAgent.get_actions`.
+
+    Args:
+        `network`: Numpy copy of the learner Q-network
+        `states`: Batch of state vectors [N, 20]
+        `epsilon`: Probability of a random action
+
+    Returns:
+        `np.ndarray`: Selected actions (0-3) [N]
+    """
+    explore = np.random.random(len(states)) < epsilon
+    actions = np.random.randint(0, 4, size=len(states))
+    if not explore.all():
+        greedy = ~explore
+        actions[greedy] = network(states[greedy]).argmax(1)
+    return actions
+
+
+def run_actor(memory: Memory,
+              weights: dict[str, torch.Tensor],
+              weights_lock,
+              version,
+              epsilon,
+              env_steps,
+              budget,
+              episodes,
+              stop,
+              envs_nb: int,
+              config: GameConfig
+              ) -> None:
+    """Actor process: play boards and push transitions to shared memory.
+
+    Actors act with a `NumpyQNetwork` built from the shared CPU weights,
+    so they never create a torch network or a CUDA context.
+
+    Args:
+        `memory`: Shared replay buffer
+        `weights`: Shared copy of the learner Q-network state dict
+        `weights_lock`: Lock held while `weights` are copied
+        `version`: Shared counter bumped on each weights publication
+        `epsilon`: Shared learner epsilon
+        `env_steps`: Shared counter of environment steps of all actors
+        `budget`: Shared number of environment steps the learner allows,
+            actors wait while a batch would exceed it
+        `episodes`: Queue receiving lengths of finished episodes
+        `stop`: Event set by the learner when training is over
+        `envs_nb`: Number of boards stepped together by this actor
+        `config`: Board size, population and rewards of the boards
+    """
+    torch.set_num_threads(1)
+    network = None
+    env = VecSnakeEnv(envs_nb, config=config)
+    states = env.reset()
+    local_version = -1
+
+    while not stop.is_set():
+        if env_steps.value + envs_nb > budget.value:
+            time.sleep(0.0005)
+            continue
+        if version.value != local_version:
+            with weights_lock:
+                network = NumpyQNetwork.from_state_dict(weights)
+                local_version = version.value
+
+        actions = epsilon_greedy(network, states, epsilon.value)
+        next_states, rewards, dones, info = env.step(actions)
+
+        # Ended boards are already reset, store their final state instead
+        final_states = next_states.copy()
+        final_states[dones] = info["final_states"]
+        memory.push_batch(states, actions, rewards, final_states, dones)
+
+        with env_steps.get_lock():
+            env_steps.value += envs_nb
+        if len(info["lengths"]):
+            episodes.put(info["lengths"].tolist())
+        states = next_states
+
+
+class ParallelTrainer(SnakeGame):
+    """Headless training with actor processes and a single learner.
+
+    Actors run `VecSnakeEnv` boards with a periodically synced copy of the
+    Q-network and write transitions into the shared replay memory. This
+    process is the learner: it samples batches, runs gradient steps and
+    keeps statistics and autosaves like `SnakeGame`.
+
+    Replay ratio:
+        Learn calls follow the agent `learn_every` and `warmup` settings
+        against the environment steps of all actors, as in single-process
+        training: once `warmup` transitions are stored, one learn call is
+        due every `learn_every` steps. Actors are throttled by a shared
+        step budget of one batch per actor ahead of the due learn calls,
+        so adding actors never lowers gradient steps per environment
+        step, and epsilon decays on the same schedule.
+
+        Environment throughput is therefore capped by the learner: with
+        `learn_every` 1, every step waits for a gradient step and actors
+        run no faster than a single process. Actors only speed training
+        up when `learn_every` is large enough that learn calls cost less
+        than collecting their steps.
+
+    Args:
+        `actors`: Number of actor processes
+        `**kwargs`: `SnakeGame` arguments
+    """
+    ENVS_PER_ACTOR = 16
+    SYNC_FREQUENCY = 100  # learn calls between weights publications
+
+    def __init__(self, actors: int, **kwargs):
+        super().__init__(**kwargs)
+        self.actors = actors
+
+    def run(self) -> None:
+        """Train until the requested number of episodes is played."""
+        self.episode = self.gameState.total_episodes
+        last_episode = self.episode + self.gameState.episode_nb
+        agent = self.snakeAgent
+        ctx = mp.get_context("spawn")
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) - self.actors))
+
+        agent.memory.share_memory(ctx.Lock())
+        self.weights = {name: tensor.detach().cpu().clone().share_memory_()
+                        for name, tensor in agent.model.state_dict().items()}
+        self.weights_lock = ctx.Lock()
+        self.version = ctx.Value("l", 0)
+        epsilon = ctx.Value("d", agent.epsilon)
+        env_steps = ctx.Value("l", 0)
+        slack = self.actors * self.ENVS_PER_ACTOR
+        budget = ctx.Value("l", slack)
+        episodes = ctx.Queue()
+        stop = ctx.Event()
+
+        processes = [
+            ctx.Process(target=run_actor,
+                        args=(agent.memory, self.weights, self.weights_lock,
+                              self.version, epsilon, env_steps, budget,
+                              episodes, stop, self.ENVS_PER_ACTOR,
+                              self.config),
+                        daemon=True)
+            for _ in range(self.actors)]
+        for process in processes:
+            process.start()
+
+        learn_calls = 0
+        learn_start = None  # environment steps when warmup was reached
+        self.start_plotter()
+        self.start = time.perf_counter()
+        try:
+            while self.episode < last_episode:
+                with COLLECT:
+                    self.collect_episodes(episodes, last_episode)
+                if learn_start is None:
+                    if len(agent.memory) < agent.warmup:
+                        budget.value = env_steps.value + slack
+                    else:
+                        learn_start = env_steps.value
+                        budget.value = learn_start + agent.learn_every + slack
+                if (learn_start is None
+                        or learn_start + (learn_calls + 1) * agent.learn_every
+                        > env_steps.value):
+                    if not any(process.is_alive() for process in processes):
+                        raise RuntimeError("Actor processes stopped")
+                    with WAIT:
+                        time.sleep(0.001)
+                    continue
+                agent.learn()
+                learn_calls += 1
+                budget.value = (learn_start
+                                + (learn_calls + 1) * agent.learn_every
+                                + slack)
+                epsilon.value = agent.epsilon
+                if learn_calls % self.SYNC_FREQUENCY == 0:
+                    with PUBLISH:
+                        self.publish_weights()
+        finally:
+            stop.set()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        self.gameState.print_periodic_stats(self.episode)
+        Profiler.print_report()
+        if self.checkpoint:
+            self.save_checkpoint(self.checkpoint)
+        self.close_metrics()
+        elapsed = time.perf_counter() - self.start
+        print(f"Environment steps: {env_steps.value} "
+              f"({env_steps.value / elapsed:.0f}/s), "
+              f"gradient steps: {agent.steps}")
+
+    def collect_episodes(self, episodes, last_episode: int) -> None:
+        """Record episodes finished by the actors since last call."""
+        while self.episode < last_episode:
+            try:
+                lengths = episodes.get_nowait()
+            except queue.Empty:
+                return
+            for length in lengths[:last_episode - self.episode]:
+                self.gameState.update(length, self.snakeAgent.epsilon,
+                                      loss=self.snakeAgent.pop_loss())
+                self.end_episode()
+
+    def publish_weights(self) -> None:
+        """Copy learner weights to the actors shared copy."""
+        with self.weights_lock:
+            for name, tensor in self.snakeAgent.model.state_dict().items():
+                self.weights[name].copy_(tensor)
+            self.version.value += 1
@@ -0,0 +1,96 @@
+import json
+import time
+from array import array
+import numpy as np
+
+
+class Phase:
+    """Timer and counter of one phase, used as a context manager.
+
+    Keeps the call count and total time of all calls, and the durations
+    of the last `SAMPLES` calls in a ring for the p99. While profiling
+    is disabled, entering and leaving a phase only checks a flag.
+
+    Args:
+        `name`: Phase name, dotted for sub-phases ("learn.backward")
+    """
+    SAMPLES = 8192
+    __slots__ = ("name", "count", "total", "samples", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total = 0
+        self.samples = array("q", bytes(8 * self.SAMPLES))
+        self.start = 0
+
+    def __enter__(self):
+        if Profiler.enabled:
+            self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc):
+        if Profiler.enabled and self.start:
+            elapsed = time.perf_counter_ns() - self.start
+            self.samples[self.count % self.SAMPLES] = elapsed
+            self.count += 1
+            self.total += elapsed
+            self.start = 0
+
+    def summary(self) -> dict:
+        """Calls, total seconds, mean and p99 microseconds."""
+        samples = np.frombuffer(self.samples, dtype=np.int64)
+        samples = samples[:min(self.count, self.SAMPLES)]
+        return {
+            "calls": self.count,
+            "total_s": self.total / 1e9,
+            "mean_us": self.total / self.count / 1e3,
+            "p99_us": float(np.percentile(samples, 99)) / 1e3,
+        }
+
+
+class Profiler:
+    """Registry of the phases of the game and training loops.
+
+    Modules create their phases once at import with `phase` and wrap
+    each phase with `with PHASE:`. Nothing is measured until `enable`
+    is called (`--profile`).
+    """
+    enabled = False
+    phases = {}
+
+    @classmethod
+    def phase(cls, name: str) -> Phase:
+        """Return the phase called `name`, created on first use."""
+        if name not in cls.phases:
+            cls.phases[name] = Phase(name)
+        return cls.phases[name]
+
+    @classmethod
+    def enable(cls) -> None:
+        cls.enabled = True
+
+    @classmethod
+    def report(cls) -> dict:
+        """Summaries of the phases that ran, by name."""
+        return {name: phase.summary()
+                for name, phase in sorted(cls.phases.items())
+                if phase.count}
+
+    @classmethod
+    def print_report(cls) -> None:
+        """Print a per-phase breakdown."""
+        if not cls.enabled:
+            return
+        print(f"{'phase':<22} {'calls':>10} {'total s':>9} "
+              f"{'mean us':>10} {'p99 us':>10}")
+        for name, summary in cls.report().items():
+            print(f"{name:<22} {summary['calls']:>10} "
+                  f"{summary['total_s']:>9.2f} {summary['mean_us']:>10.1f} "
+                  f"{summary['p99_us']:>10.1f}")
+
+    @classmethod
+    def save(cls, path: str) -> None:
+        """Write the per-phase breakdown to a JSON file."""
+        with open(path, "w") as file:
+            json.dump(cls.report(), file, indent=2)
+        print(f"Profile written to '{path}'")
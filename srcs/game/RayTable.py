@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class RayTable:
+    """Wall distances along the four rays from each cell of a
+    `VecSnakeEnv` board.
+
+    Tables only depend on the grid size: `get` builds them once per size
+    and process, on first use, and every environment of that size shares
+    them.
+
+    Args:
+        `grid_size`: Number of cells on each side of the board
+
+    Implementation:
+        Tables are indexed by `y * G + x` with the sentinel cell `G*G`,
+        directions [up,down,left,right]:
+        - lengths[G*G + 1, 4]: cells from the cell to the wall, itself
+          included, 0 for the sentinel
+        - walls[G*G + 1, 4]: lengths normalized by the grid size
+
+        Ray cells are not stored: the cell k steps away is a fixed offset
+        from the cell, valid while k < length.
+    """
+    cache = {}
+
+    def __init__(self, grid_size: int):
+        self.grid_size = grid_size
+        cells = grid_size ** 2
+        y, x = np.divmod(np.arange(cells), grid_size)
+        self.lengths = np.zeros((cells + 1, 4), dtype=np.int64)
+        self.lengths[:-1] = np.stack([y + 1, grid_size - y,
+                                      x + 1, grid_size - x], axis=1)
+        self.walls = self.lengths / grid_size
+
+    @classmethod
+    def get(cls, grid_size: int) -> "RayTable":
+        """Return the tables of `grid_size`, built on first use."""
+        if grid_size not in cls.cache:
+            cls.cache[grid_size] = cls(grid_size)
+        return cls.cache[grid_size]
@@ -0,0 +1,60 @@
+from collections import deque
+from .Board import Board
+
+
+class Snake:
+    """Snake body as a deque of packed board indices, head first.
+
+    Args:
+        `board`: Occupancy grid kept in sync with the body
+        `segments`: Initial coordinates [[y,x], ...], head first
+
+    Implementation:
+        Head insertion and tail removal are O(1) deque operations, and
+        the segment counts of `board` serve as membership index, so
+        `[y, x] in snake` is O(1) too.
+
+        Reading works like the former list of [y,x]: `len`, iteration,
+        indexing and slicing return coordinates.
+    """
+    def __init__(self, board: Board, segments: list[list] = ()):
+        self.board = board
+        self.cells = deque()
+        for y, x in segments:
+            self.cells.append(board.pack(y, x))
+            board.add_body(y, x)
+
+    def push_head(self, y: int, x: int) -> None:
+        """Add a new head on cell [y,x]."""
+        self.cells.appendleft(self.board.pack(y, x))
+        self.board.add_body(y, x)
+
+    def pop_tail(self) -> list[int]:
+        """Remove the last segment and return its coordinates [y,x]."""
+        tail = self.board.unpack(self.cells.pop())
+        self.board.remove_body(*tail)
+        return tail
+
+    @property
+    def head(self) -> list[int]:
+        """Head coordinates [y,x]."""
+        return self.board.unpack(self.cells[0])
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __iter__(self):
+        unpack = self.board.unpack
+        return (unpack(cell) for cell in self.cells)
+
+    def __getitem__(self, index: int | slice) -> list:
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self.board.unpack(self.cells[index])
+
+    def __contains__(self, position: list[int]) -> bool:
+        y, x = position
+        size = self.board.grid_size
+        if not (-1 <= y <= size and -1 <= x <= size):
+            return False
+        return self.board.body[self.board.pack(y, x)] > 0
@@ -0,0 +1,189 @@
+import random
+from .Board import Board
+from .Snake import Snake
+from .Spawner import Spawner
+from .GameConfig import GameConfig
+from .Profiler import Profiler
+from ..agent.Interpreter import Interpreter
+
+MOVE = Profiler.phase("env.move")
+REWARD = Profiler.phase("env.reward")
+FRUIT_SPAWN = Profiler.phase("env.fruit_spawn")
+GET_STATE = Profiler.phase("env.get_state")
+
+
+class SnakeEnv:
+    """Headless Snake game with a reset/step interface.
+
+    Holds the whole simulation (snake, fruits, rewards, game over) with no
+    pygame dependency, so it can be driven by any training or evaluation
+    loop. `SnakeGame` adds display, events and the agent on top of it.
+
+    Args:
+        `seed`: Optional seed of the environment random generator
+        `config`: Board size, population and rewards, default
+            `GameConfig()`
+    """
+    ACTIONS = {"TOP": (-1, 0),
+               "BOTTOM": (1, 0),
+               "LEFT": (0, -1),
+               "RIGHT": (0, 1)}
+    DIRECTIONS = ("TOP", "BOTTOM", "LEFT", "RIGHT")
+
+    def __init__(self,
+                 seed: int | None = None,
+                 config: GameConfig | None = None):
+        self.config = config or GameConfig()
+        self.rng = random.Random(seed)
+        self.board = Board(self.config.grid_size)
+        self.interpreter = Interpreter(self.config)
+        self.gameover = True
+
+    def reset(self, seed: int | None = None) -> list:
+        """Start a new episode with a new snake and new fruits.
+
+        Args:
+            `seed`: Optional new seed of the environment random generator
+
+        Returns:
+            `list`: Initial state vector
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+
+        config = self.config
+        snake, self.direction = Spawner.snake_spawn(config.snake_size,
+                                                    config.grid_size,
+                                                    self.ACTIONS,
+                                                    self.rng)
+        fruits_nb = config.red_fruits + config.green_fruits
+        if fruits_nb >= (config.cells - len(snake)):
+            raise AssertionError("Not enough place to spawn fruits")
+        self.board.clear()
+        self.snake = Snake(self.board, snake)
+        self.snake_head = self.snake.head
+        self.spawn_fruits()
+
+        self.step_no_food = 0
+        self.gameover = False
+        return self.get_state()
+
+    def step(self, action: int | None) -> tuple[list, float, bool, dict]:
+        """Move the snake one cell and resolve the step.
+
+        Args:
+            `action`: Direction code (0:TOP, 1:BOTTOM, 2:LEFT, 3:RIGHT),
+                None to keep the current direction
+
+        Returns:
+            `tuple`: (next_state, reward, done, info) where info holds the
+            snake "length" and the game over "cause" (None, "wall",
+            "body", "red_fruit", "starvation" or "win")
+        """
+        if action is not None:
+            self.change_direction(action)
+        with MOVE:
+            self.move_snake()
+        self.cause = None
+        with REWARD:
+            reward = self.reward()
+        with GET_STATE:
+            state = self.get_state()
+        return (state, reward, self.gameover,
+                {"length": len(self.snake), "cause": self.cause})
+
+    def spawn_fruits(self) -> None:
+        """Spawn initial green and red fruits."""
+        self.green_fruits = []
+        self.red_fruits = []
+        for _ in range(self.config.green_fruits):
+            self.green_fruits.append(Spawner.fruit_spawn(self.board,
+                                                         self.rng))
+            self.board.add_fruit(*self.green_fruits[-1], Board.GREEN)
+        for _ in range(self.config.red_fruits):
+            self.red_fruits.append(Spawner.fruit_spawn(self.board,
+                                                       self.rng))
+            self.board.add_fruit(*self.red_fruits[-1], Board.RED)
+
+    def get_state(self) -> list:
+        """Get current state from interpreter."""
+        return self.interpreter.get_state(
+            self.snake,
+            self.green_fruits,
+            self.red_fruits,
+            self.board
+        )
+
+    def change_fruit_pos(self, fruit_lst: list[list], kind: int) -> None:
+        """Update position of eaten fruit.
+
+        Args:
+            `fruit_lst`: List of fruits to update
+            `kind`: Board code of the fruits (Board.GREEN or Board.RED)
+        """
+        fruit_lst.remove(self.snake_head)
+        self.board.remove_fruit(*self.snake_head)
+        with FRUIT_SPAWN:
+            new_fruit = Spawner.fruit_spawn(self.board, self.rng)
+        if new_fruit is not None:
+            fruit_lst.append(new_fruit)
+            self.board.add_fruit(*new_fruit, kind)
+
+    def reward(self) -> float:
+        """Calculate reward for current step.
+
+        Returns:
+            `float`: Reward value based on game events
+        """
+        config = self.config
+        reward, self.gameover = self.interpreter.get_reward(
+            self.snake_head,
+            self.snake,
+            self.green_fruits,
+            self.red_fruits,
+            self.board
+        )
+        # Branch on what was eaten, rewards may be configured equal
+        head = self.board.pack(*self.snake_head)
+        eaten = Board.EMPTY if self.gameover else self.board.cells[head]
+        if eaten == Board.GREEN:
+            self.step_no_food = 0
+            self.change_fruit_pos(self.green_fruits, Board.GREEN)
+            if len(self.snake) >= (config.cells - (config.red_fruits)):
+                self.gameover = True
+                self.cause = "win"
+                return config.r_win
+        elif eaten == Board.RED:
+            self.step_no_food = 0
+            self.snake.pop_tail()
+            if len(self.snake) <= 1:
+                self.gameover = True
+                self.cause = "red_fruit"
+                return config.r_collision
+            self.snake.pop_tail()
+            self.change_fruit_pos(self.red_fruits, Board.RED)
+        else:
+            if self.gameover:
+                wall = self.board.cells[head] == Board.WALL
+                self.cause = "wall" if wall else "body"
+            self.snake.pop_tail()
+            self.step_no_food += 1
+            if self.step_no_food == config.cells and not self.gameover:
+                self.gameover = True
+                self.cause = "starvation"
+        return reward
+
+    def move_snake(self) -> None:
+        """Update snake position based on current direction."""
+        new_head = [h + a for h, a in zip(self.snake_head,
+                                          self.ACTIONS[self.direction])]
+        self.snake.push_head(*new_head)
+        self.snake_head = new_head
+
+    def change_direction(self, key: int) -> None:
+        """Change snake direction based on action.
+
+        Args:
+            `key`: Direction code (0:TOP, 1:BOTTOM, 2:LEFT, 3:RIGHT)
+        """
+        self.direction = self.DIRECTIONS[key]
@@ -1,20 +1,49 @@
 import pygame as pg
 import os
+import pickle
+import random
+import time
+import numpy as np
+import torch
 from ..display.GameDraw import GameDraw
 from ..agent.SnakeAgent import SnakeAgent
-from .Spawner import Spawner
-from ..agent.Interpreter import Interpreter
+from ..agent.StepRecord import StepRecord
+from .SnakeEnv import SnakeEnv
+from .GameConfig import GameConfig
 from .EventHandler import EventHandler
 from .GameState import GameState
+from .MetricsLog import MetricsLog
+from .Profiler import Profiler
 from ..display.Colors import Colors as Col
 from ..display.display import print_experience
-from settings import GRID_SIZE, FPS, GREEN_FRUITS_NB, \
-                     RED_FRUITS_NB, SNAKE_SIZE, \
-                     R_GREEN_FRUIT, R_RED_FRUIT, R_COLLISION
+from ..display.Plotter import BackgroundPlotter
+from settings import FPS
+
+EVENTS = Profiler.phase("events")
+DRAW = Profiler.phase("draw")
 
 
 class SnakeGame:
-    """Main game class handling snake logic and game loop."""
+    """Interactive game loop around a headless `SnakeEnv`.
+
+    Adds the agent, user events, display and statistics on top of the
+    simulation held by `self.env`.
+
+    Rendering:
+        By default a frame is drawn after every step and the loop is paced
+        at `speed` steps per second. With `render_fps`, `render_every` or
+        `render_episodes`, the simulation runs unthrottled and frames are
+        only drawn on that schedule; events are still handled every step.
+        Paused step-by-step loops keep drawing at `speed`.
+
+    Metrics:
+        Each episode appends a row to the `metrics` CSV log (by default
+        next to the plot when `plot` is set). Plots are regenerated from
+        that log by a `BackgroundPlotter` process.
+
+    Board size, population and rewards come from `config`, shared by the
+    environment, the interpreter and the renderer.
+    """
     def __init__(self,
                  episode: int,
                  visual: str,
@@ -24,22 +53,61 @@ class SnakeGame:
                  step_by_step: bool,
                  is_ai_control: bool,
                  debug: bool,
-                 surface=None):
-
+                 surface=None,
+                 learn_every: int = 1,
+                 gradient_steps: int = 1,
+                 warmup: int = 0,
+                 prioritized: bool = False,
+                 double_dqn: bool = False,
+                 n_step: int = 1,
+                 checkpoint: str | None = None,
+                 resume: str | None = None,
+                 render_fps: float = 0,
+                 render_every: int = 1,
+                 render_episodes: int = 1,
+                 metrics: str | None = None,
+                 config: GameConfig | None = None):
+
+        self.config = config or GameConfig()
         self.plot = plot
+        self.checkpoint = checkpoint
         self.model = model
-        self.snakeAgent = SnakeAgent(training=train, model=self.model)
+        self.snakeAgent = SnakeAgent(training=train,
+                                     model=self.model,
+                                     learn_every=learn_every,
+                                     gradient_steps=gradient_steps,
+                                     warmup=warmup,
+                                     prioritized=prioritized,
+                                     double_dqn=double_dqn,
+                                     n_step=n_step)
         self.gameState = GameState(is_ai_control,
                                    step_by_step,
                                    episode,
                                    visual,
                                    debug,
-                                   train)
-        self.interpreter = Interpreter()
+                                   train,
+                                   self.config.cells)
+        self.env = SnakeEnv(config=self.config)
+
+        if plot and not metrics:
+            metrics = os.path.join("plot",
+                                   os.path.splitext(plot)[0] + ".csv")
+        self.metrics = metrics
+        if metrics:
+            self.gameState.metrics = MetricsLog(metrics,
+                                                append=bool(resume))
+        self.plotter = None
 
         self.surface = surface
         if self.gameState.visual:
             self.clock = pg.time.Clock()
+            GameDraw.configure(self.config)
+        self.render_fps = render_fps
+        self.render_every = render_every
+        self.render_episodes = render_episodes
+        self.throttled = (not render_fps and render_every == 1
+                          and render_episodes == 1)
+        self.last_frame = 0.0
 
         if episode < 100:
             self.print_frequency = 10
@@ -49,87 +117,167 @@ class SnakeGame:
             self.print_frequency = max(episode // 10, 1)
         self.speed = FPS ** 3 if train else FPS
 
+        if resume:
+            self.load_checkpoint(resume)
+            print(f"Training resumed from {Col.GREEN}'{resume}'{Col.END} "
+                  f"at episode {self.gameState.total_episodes}")
+
     def run(self) -> None:
         """Run multiple game episodes."""
-        self.episode = 0
+        self.episode = self.gameState.total_episodes
+        self.start_plotter()
         for _ in range(self.gameState.episode_nb):
-            self.step_no_food = 0
             is_continue = self.run_episode()
             if not is_continue:
                 break
+            self.end_episode()
 
-            self.episode += 1
-
-            # Print statistics
-            if self.episode % self.print_frequency == 0:
-                self.gameState.print_periodic_stats(self.print_frequency)
-
-            # Plot stats every 100 episodes
-            if self.plot and self.episode % 100 == 0:
-                self.gameState.plot_statistics(self.plot)
+        self.gameState.print_periodic_stats(self.episode)
+        Profiler.print_report()
+        if self.gameState.training and self.checkpoint:
+            self.save_checkpoint(self.checkpoint)
+        self.close_metrics()
+
+    def start_plotter(self) -> None:
+        """Start the background plot process if plots are requested."""
+        if self.plot:
+            self.plotter = BackgroundPlotter(self.metrics,
+                                             os.path.join("plot", self.plot))
+
+    def close_metrics(self) -> None:
+        """Flush the metrics log and wait for the final plot."""
+        if self.gameState.metrics:
+            self.gameState.metrics.close()
+        if self.plotter:
+            self.plotter.close()
+            print(f"Plot saved: {Col.GREEN}"
+                  f"'{os.path.join('plot', self.plot)}'{Col.END}")
+
+    def end_episode(self) -> None:
+        """Count finished episode, report statistics and autosave model."""
+        self.episode += 1
+
+        # Print statistics
+        if self.episode % self.print_frequency == 0:
+            self.gameState.print_periodic_stats(self.print_frequency)
+            Profiler.print_report()
+            if self.gameState.metrics:
+                self.gameState.metrics.flush()
+
+        # Plot stats every 100 episodes, in the plotter process
+        if self.plotter and self.episode % 100 == 0:
+            self.gameState.metrics.flush()
+            self.plotter.request()
+
+        # Autosave model
+        if self.gameState.training:
+            if (self.episode in [10, 50, 100] or
+                    self.episode % 2000 == 0):
+                path = f"model/{self.episode}_ep.pt"
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self.snakeAgent.save_model(path)
+                print(f"Model autosave: {Col.GREEN}'{path}'{Col.END}")
+                if self.checkpoint:
+                    self.save_checkpoint(self.checkpoint)
+
+    def save_checkpoint(self, directory: str) -> None:
+        """Save agent, replay memory, statistics and random states.
 
-            # Autosave model
-            if self.gameState.training:
-                if (self.episode in [10, 50, 100] or
-                        self.episode % 2000 == 0):
-                    path = f"model/{self.episode}_ep.pt"
-                    os.makedirs(os.path.dirname(path), exist_ok=True)
-                    self.snakeAgent.save_model(path)
-                    print(f"Model autosave: {Col.GREEN}'{path}'{Col.END}")
+        Args:
+            `directory`: Checkpoint directory
+        """
+        self.snakeAgent.save_checkpoint(directory)
+        game = {
+            "game_state": self.gameState.state_dict(),
+            "random": random.getstate(),
+            "numpy": np.random.get_state(),
+            "torch": torch.get_rng_state(),
+            "env": self.env.rng.getstate(),
+        }
+        with open(os.path.join(directory, "game.pkl"), "wb") as file:
+            pickle.dump(game, file)
+        print(f"Checkpoint saved: {Col.GREEN}'{directory}'{Col.END}")
+
+    def load_checkpoint(self, directory: str) -> None:
+        """Restore a checkpoint written by `save_checkpoint`.
 
-        self.gameState.print_periodic_stats(self.episode)
+        Args:
+            `directory`: Checkpoint directory
+        """
+        self.snakeAgent.load_checkpoint(directory)
+        with open(os.path.join(directory, "game.pkl"), "rb") as file:
+            game = pickle.load(file)
+        self.gameState.load_state_dict(game["game_state"])
+        random.setstate(game["random"])
+        np.random.set_state(game["numpy"])
+        torch.set_rng_state(game["torch"])
+        self.env.rng.setstate(game["env"])
+
+    def episode_step(self, record: StepRecord) -> StepRecord:
+        """Execute one step of an episode.
 
-    def episode_step(self, state: list) -> list:
-        """Execute one step of an episode."""
-        action = self.snakeAgent.get_action(state, self.gameState.debug)
+        Args:
+            `record`: Record of the current step, completed here
 
-        if self.gameState.is_ai_control:
-            self.change_direction(action)
-        self.move_snake()
+        Returns:
+            `StepRecord`: Record of the next step
+        """
+        action = self.snakeAgent.act(record)
 
-        reward = self.reward()
-        next_state = self.get_state()
+        next_state, reward, done, _ = self.env.step(
+            action if self.gameState.is_ai_control else None)
+        self.gameState.gameover = done
+        record.action, record.reward, record.done = action, reward, done
 
         if self.gameState.debug:
-            print_experience(state, action, reward, self.gameState.gameover)
+            print_experience(record)
 
         if self.gameState.training:
-            self.snakeAgent.update(state,
+            self.snakeAgent.update(record.state,
                                    action,
                                    reward,
                                    next_state,
-                                   self.gameState.gameover
+                                   done
                                    )
         self.gameState.step += 1
-        return next_state
-
-    def spawn_fruits(self) -> None:
-        """Spawn initial green and red fruits."""
-        self.green_fruits = []
-        self.red_fruits = []
-        for _ in range(GREEN_FRUITS_NB):
-            self.green_fruits.append(
-                Spawner.fruit_spawn(self.snake, self.green_fruits,
-                                    self.red_fruits, GRID_SIZE))
-        for _ in range(RED_FRUITS_NB):
-            self.red_fruits.append(
-                Spawner.fruit_spawn(self.snake, self.green_fruits,
-                                    self.red_fruits, GRID_SIZE))
-
-    def init_episode(self) -> None:
-        """Initialize snake and direction for new episode."""
-        self.actions = {"TOP": (-1, 0),
-                        "BOTTOM": (1, 0),
-                        "LEFT": (0, -1),
-                        "RIGHT": (0, 1)}
-
-        self.snake, self.direction = Spawner.snake_spawn(SNAKE_SIZE,
-                                                         GRID_SIZE,
-                                                         self.actions)
-        fruits_nb = RED_FRUITS_NB + GREEN_FRUITS_NB
-        if fruits_nb >= (GRID_SIZE**2 - len(self.snake)):
-            raise AssertionError("Not enough place to spawn fruits")
-        self.snake_head = self.snake[0]
+        return StepRecord(next_state)
+
+    def draw(self) -> None:
+        """Draw current frame and wait for next tick."""
+        self.draw_frame()
+        self.clock.tick(self.speed)
+
+    def draw_frame(self) -> None:
+        """Draw current frame from the current step record."""
+        with DRAW:
+            self.snakeAgent.evaluate(self.record)
+            GameDraw.draw_game(
+                surface=self.surface,
+                gameState=self.gameState,
+                snake=self.env.snake,
+                green_fruits=self.env.green_fruits,
+                red_fruits=self.env.red_fruits,
+                episode=self.episode,
+                record=self.record)
+
+    def render(self, stepped: bool, render_episode: bool) -> None:
+        """Draw a frame if one is due after a loop iteration.
+
+        Args:
+            `stepped`: Whether the iteration advanced the game
+            `render_episode`: Whether the current episode is rendered
+        """
+        if self.throttled or not stepped:
+            self.draw()
+            return
+        if not render_episode or self.gameState.step % self.render_every:
+            return
+        if self.render_fps:
+            now = time.perf_counter()
+            if now - self.last_frame < 1 / self.render_fps:
+                return
+            self.last_frame = now
+        self.draw_frame()
 
     def run_episode(self) -> bool:
         """Run a single game episode.
@@ -137,121 +285,34 @@ class SnakeGame:
         Returns:
             `bool`: False if game quit, True otherwise
         """
-        self.init_episode()
-        self.spawn_fruits()
-        state = self.get_state()
+        self.record = StepRecord(self.env.reset())
+        render_episode = self.episode % self.render_episodes == 0
 
-        if self.gameState.visual:
-            GameDraw.draw_game(
-                surface=self.surface,
-                gameState=self.gameState,
-                snake=self.snake,
-                green_fruits=self.green_fruits,
-                red_fruits=self.red_fruits,
-                episode=self.episode,
-                snakeAgent=self.snakeAgent)
-            self.clock.tick(self.speed)
+        if self.gameState.visual and render_episode:
+            self.draw()
 
         while not self.gameState.gameover:
-            quit_game, step_move = EventHandler.handle(
-                self.gameState,
-                self.snakeAgent,
-                self.change_direction,
-            )
+            with EVENTS:
+                quit_game, step_move = EventHandler.handle(
+                    self.gameState,
+                    self.snakeAgent,
+                    self.env.change_direction,
+                )
             if quit_game:
                 return False
 
-            if self.gameState.should_step(step_move):
-                state = self.episode_step(state)
+            stepped = self.gameState.should_step(step_move)
+            if stepped:
+                self.record = self.episode_step(self.record)
 
             if self.gameState.visual:
-                GameDraw.draw_game(
-                    surface=self.surface,
-                    gameState=self.gameState,
-                    snake=self.snake,
-                    green_fruits=self.green_fruits,
-                    red_fruits=self.red_fruits,
-                    episode=self.episode,
-                    snakeAgent=self.snakeAgent)
-                self.clock.tick(self.speed)
-
-        self.gameState.update(len(self.snake),
-                              self.snakeAgent.epsilon)
-
-        return True
-
-    def get_state(self) -> list:
-        """Get current state from interpreter."""
-        return self.interpreter.get_state(
-            self.snake,
-            self.green_fruits,
-            self.red_fruits
-        )
+                self.render(stepped, render_episode)
 
-    def change_fruit_pos(self, fruit_lst: list[list]) -> None:
-        """Update position of eaten fruit.
+        self.gameState.update(len(self.env.snake),
+                              self.snakeAgent.epsilon,
+                              self.gameState.step,
+                              self.env.cause,
+                              self.snakeAgent.pop_loss()
+                              if self.gameState.training else None)
 
-        Args:
-            `fruit_lst`: List of fruits to update
-        """
-        fruit_lst.remove(self.snake_head)
-        new_fruit = Spawner.fruit_spawn(self.snake, self.green_fruits,
-                                        self.red_fruits, GRID_SIZE)
-        if new_fruit is not None:
-            fruit_lst.append(new_fruit)
-
-    def reward(self) -> float:
-        """Calculate reward for current step.
-
-        Returns:
-            `float`: Reward value based on game events
-        """
-        reward, self.gameState.gameover = self.interpreter.get_reward(
-            self.snake_head,
-            self.snake,
-            self.green_fruits,
-            self.red_fruits
-        )
-        if reward == R_GREEN_FRUIT:
-            self.step_no_food = 0
-            self.change_fruit_pos(self.green_fruits)
-            if len(self.snake) >= (GRID_SIZE**2 - (RED_FRUITS_NB)):
-                self.gameState.gameover = True
-                return 100
-        elif reward == R_RED_FRUIT:
-            self.step_no_food = 0
-            self.snake.pop()
-            if len(self.snake) <= 1:
-                self.gameState.gameover = True
-                return R_COLLISION
-            self.snake.pop()
-            self.change_fruit_pos(self.red_fruits)
-        else:
-            self.snake.pop()
-            self.step_no_food += 1
-            if self.step_no_food == GRID_SIZE ** 2:
-                self.gameState.gameover = True
-        return reward
-
-    def move_snake(self) -> None:
-        """Update snake position based on current direction."""
-        new_head = [h + a for h, a in zip(self.snake_head,
-                                          self.actions[self.direction])]
-        self.snake.insert(0, new_head)
-        self.snake_head = self.snake[0]
-
-    def change_direction(self, key: int) -> None:
-        """Change snake direction based on action.
-
-        Args:
-            `key`: Direction code (0:TOP, 1:BOTTOM, 2:LEFT, 3:RIGHT)
-        """
-        match key:
-            case 0:
-                self.direction = "TOP"
-            case 1:
-                self.direction = "BOTTOM"
-            case 2:
-                self.direction = "LEFT"
-            case 3:
-                self.direction = "RIGHT"
+        return True
@@ -1,53 +1,148 @@
 import random
+import numpy as np
+from .Board import Board
 
 
 class Spawner:
+    """Random placement of snakes and fruits.
+
+    Implementation:
+        Valid snake placements (head cell and body direction such that
+        the whole body is on the board) only depend on the grid size,
+        the snake size and the directions. They are enumerated once with
+        numpy and cached in `placements` as the heads where at least one
+        direction fits, with the indices of their fitting directions.
+
+        A spawn draws a uniform head among them, then a uniform direction
+        among its fitting ones, as rejection sampling of heads would, in
+        two O(1) draws.
+    """
+    DIRECTIONS = {"TOP": (-1, 0),
+                  "BOTTOM": (1, 0),
+                  "LEFT": (0, -1),
+                  "RIGHT": (0, 1)}
+    # Inverse of body spawn direction, have a natural first direction
+    INVERSE = {"TOP": "BOTTOM", "BOTTOM": "TOP",
+               "LEFT": "RIGHT", "RIGHT": "LEFT"}
+    placements = {}  # {(grid_size, snake_size, directions): table}
 
     @staticmethod
-    def snake_spawn(snake_size, grid_size, directions: dict[str, tuple]):
+    def placement_table(snake_size: int,
+                        grid_size: int,
+                        directions: dict[str, tuple] = DIRECTIONS
+                        ) -> dict:
+        """Return the cached placements of a snake on a board.
+
+        Args:
+            `snake_size`: Snake length
+            `grid_size`: Number of cells on each side of the board
+            `directions`: {name: (dy, dx)} of the possible directions
+
+        Returns:
+            `dict` with:
+            - "heads": packed cells y * grid_size + x of the heads [H]
+            - "count": number of fitting body directions of each head [H]
+            - "order": indices in `directions` of the fitting body
+              directions of each head, first `count` columns [H, D]
+            - "first": index in `directions` of the first move of each
+              body direction [D]
+            - "names": names of `directions`, in order
+        """
         if snake_size > grid_size:
             raise AssertionError("Snake can't be greater than grid size")
+        key = (grid_size, snake_size, tuple(directions.items()))
+        if key in Spawner.placements:
+            return Spawner.placements[key]
 
-        while True:
-            snake = [[random.randint(0, grid_size - 1),
-                      random.randint(0, grid_size - 1)]]
-            head_x, head_y = snake[0][1], snake[0][0]
+        names = list(directions)
+        deltas = np.array([directions[name] for name in names])
+        ys, xs = np.divmod(np.arange(grid_size ** 2), grid_size)
+        tail_y = ys[:, None] + deltas[:, 0] * (snake_size - 1)
+        tail_x = xs[:, None] + deltas[:, 1] * (snake_size - 1)
+        valid = ((0 <= tail_y) & (tail_y < grid_size)
+                 & (0 <= tail_x) & (tail_x < grid_size))
 
-            valid_directions = []
-            for dir_name, (dy, dx) in directions.items():
-                new_y = head_y + dy * (snake_size - 1)
-                new_x = head_x + dx * (snake_size - 1)
-                if 0 <= new_y < grid_size and 0 <= new_x < grid_size:
-                    valid_directions.append((dir_name, dy, dx))
+        count = valid.sum(axis=1)
+        heads = np.flatnonzero(count)
+        table = {
+            "heads": heads,
+            "count": count[heads],
+            "order": np.argsort(~valid[heads], axis=1,
+                                kind="stable").astype(np.uint8),
+            "first": np.array([names.index(Spawner.INVERSE.get(name, name))
+                               for name in names]),
+            "names": names,
+        }
+        Spawner.placements[key] = table
+        return table
 
-            if not valid_directions:
-                continue
+    @staticmethod
+    def snake_spawn(snake_size,
+                    grid_size,
+                    directions: dict[str, tuple] = DIRECTIONS,
+                    rng: random.Random = random):
+        """Return a straight snake at a random valid placement.
 
-            body_spawn_dir, dy, dx = random.choice(valid_directions)
+        Args:
+            `snake_size`: Snake length
+            `grid_size`: Number of cells on each side of the board
+            `directions`: {name: (dy, dx)} of the possible directions
+            `rng`: Random generator to draw with, `random` module default
 
-            # Build snake
-            for _ in range(1, snake_size):
-                head_y += dy
-                head_x += dx
-                snake.append([head_y, head_x])
+        Returns:
+            `tuple`: (snake [[y,x], ...] head first, first direction name)
+        """
+        table = Spawner.placement_table(snake_size, grid_size, directions)
+        i = rng.randrange(len(table["heads"]))
+        body = table["order"].item(i, rng.randrange(table["count"].item(i)))
+        y, x = divmod(table["heads"].item(i), grid_size)
+        names = table["names"]
+        dy, dx = directions[names[body]]
+        snake = [[y + dy * k, x + dx * k] for k in range(snake_size)]
+        return snake, names[table["first"].item(body)]
 
-            # Inverse of body spawn direction, have a natural first direction
-            inverse_dir = {"TOP": "BOTTOM", "BOTTOM": "TOP",
-                           "LEFT": "RIGHT", "RIGHT": "LEFT"}
-            snake_direction = inverse_dir[body_spawn_dir]
+    @staticmethod
+    def snake_spawn_batch(snake_size: int,
+                          grid_size: int,
+                          n: int,
+                          rng: np.random.Generator,
+                          directions: dict[str, tuple] = DIRECTIONS
+                          ) -> tuple[np.ndarray, np.ndarray]:
+        """Return `n` straight snakes at random valid placements.
+
+        Args:
+            `snake_size`: Snake length
+            `grid_size`: Number of cells on each side of the board
+            `n`: Number of snakes
+            `rng`: Numpy random generator to draw with
+            `directions`: {name: (dy, dx)} of the possible directions
 
-            return snake, snake_direction
+        Returns:
+            `tuple`: (snakes, first) where snakes [n, snake_size, 2] holds
+            the (y, x) cells, head first, and first [n] the index in
+            `directions` of the first move
+        """
+        table = Spawner.placement_table(snake_size, grid_size, directions)
+        draws = rng.integers(len(table["heads"]), size=n)
+        picks = (rng.random(n) * table["count"][draws]).astype(np.int64)
+        body = table["order"][draws, picks]
+        deltas = np.array(list(directions.values()))[body]
+        segments = np.arange(snake_size)[:, None]
+        heads = np.stack(np.divmod(table["heads"][draws], grid_size), axis=1)
+        snakes = heads[:, None, :] + deltas[:, None, :] * segments
+        return snakes, table["first"][body]
 
     @staticmethod
-    def fruit_spawn(snake, green_lst, red_lst, grid_size):
-        all_occupied = {tuple(pos)
-                        for pos in (snake + green_lst + red_lst)}
-        all_positions = {(y, x)
-                         for y in range(grid_size)
-                         for x in range(grid_size)}
-        available_positions = list(all_positions - all_occupied)
-
-        if available_positions:
-            y, x = random.choice(available_positions)
-            return [y, x]
-        return None
+    def fruit_spawn(board: Board,
+                    rng: random.Random = random
+                    ) -> list[int] | None:
+        """Return a random empty cell [y,x] for a new fruit.
+
+        Args:
+            `board`: Occupancy grid of the game
+            `rng`: Random generator to draw with, `random` module default
+
+        Returns:
+            `list`: Fruit coordinates [y,x], None if no cell is empty
+        """
+        return board.random_free_cell(rng)
@@ -0,0 +1,186 @@
+import json
+import math
+import multiprocessing as mp
+import os
+import re
+import numpy as np
+from .SnakeEnv import SnakeEnv
+from ..agent.NumpyQNetwork import NumpyQNetwork
+
+CAUSES = ("wall", "body", "red_fruit", "starvation", "win")
+Z_95 = 1.959964
+
+_weights = {}
+_networks = {}
+
+
+def init_worker(weights: dict[str, dict]) -> None:
+    """Worker initializer: keep numpy weights of every checkpoint."""
+    _weights.update(weights)
+
+
+def play_episode(job: tuple[str, int]) -> tuple[str, int, int, str, int]:
+    """Worker: play one greedy episode of a checkpoint on a seeded board.
+
+    Networks are built once per worker process and checkpoint, from
+    numpy weights: workers never import torch.
+
+    Args:
+        `job`: (checkpoint path, board seed)
+
+    Returns:
+        `tuple`: (checkpoint path, seed, final length, game over cause,
+        steps played)
+    """
+    path, seed = job
+    if path not in _networks:
+        _networks[path] = NumpyQNetwork(_weights[path])
+    network = _networks[path]
+
+    env = SnakeEnv()
+    state, done, steps = env.reset(seed), False, 0
+    while not done:
+        state, _, done, info = env.step(int(network(state).argmax()))
+        steps += 1
+    return path, seed, info["length"], info["cause"], steps
+
+
+def wilson_interval(successes: int, n: int) -> tuple[float, float]:
+    """95% Wilson score interval of a proportion."""
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denominator = 1 + Z_95 ** 2 / n
+    center = (p + Z_95 ** 2 / (2 * n)) / denominator
+    half = (Z_95 * math.sqrt(p * (1 - p) / n + Z_95 ** 2 / (4 * n * n))
+            / denominator)
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def bootstrap_interval(values: np.ndarray,
+                       statistic,
+                       resamples: int = 1000,
+                       seed: int = 0
+                       ) -> tuple[float, float]:
+    """95% percentile bootstrap interval of `statistic` over `values`."""
+    rng = np.random.default_rng(seed)
+    samples = values[rng.integers(0, len(values),
+                                  size=(resamples, len(values)))]
+    estimates = statistic(samples, axis=1)
+    low, high = np.percentile(estimates, (2.5, 97.5))
+    return float(low), float(high)
+
+
+def summarize(lengths: list[int], causes: list[str]) -> dict:
+    """Length statistics and death causes of one checkpoint.
+
+    Args:
+        `lengths`: Final length of each episode
+        `causes`: Game over cause of each episode
+
+    Returns:
+        `dict`: Mean, median, p95 and max length with 95% intervals,
+        and the share of each cause with its Wilson interval
+    """
+    values = np.asarray(lengths, dtype=np.float64)
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    mean = values.mean()
+    half = Z_95 * std / math.sqrt(n)
+
+    def p95(array, axis=None):
+        return np.percentile(array, 95, axis=axis)
+
+    summary = {
+        "episodes": n,
+        "mean": float(mean),
+        "mean_ci": [float(mean - half), float(mean + half)],
+        "median": float(np.median(values)),
+        "median_ci": bootstrap_interval(values, np.median),
+        "p95": float(p95(values)),
+        "p95_ci": bootstrap_interval(values, p95),
+        "max": int(values.max()),
+        "causes": {},
+    }
+    for cause in CAUSES:
+        count = causes.count(cause)
+        summary["causes"][cause] = {
+            "count": count,
+            "share": count / n,
+            "ci": wilson_interval(count, n),
+        }
+    return summary
+
+
+class Tournament:
+    """Evaluate checkpoints greedily on the same seeded boards.
+
+    Every (checkpoint, seed) pair is one job of a process pool, so all
+    checkpoints face the exact same initial boards and fruit sequences
+    (as long as they take the same moves). Model files are converted to
+    numpy weights here and sent to the workers once.
+
+    Args:
+        `checkpoints`: Paths of model files to evaluate
+        `seeds`: Board seeds played by every checkpoint
+        `workers`: Number of worker processes
+    """
+    def __init__(self,
+                 checkpoints: list[str],
+                 seeds: list[int],
+                 workers: int):
+        self.checkpoints = sorted(checkpoints, key=self.natural_key)
+        self.seeds = seeds
+        self.workers = workers
+        self.results = {}
+
+    @staticmethod
+    def natural_key(path: str) -> list:
+        """Sort key ordering '10_ep.pt' before '100_ep.pt'."""
+        return [int(part) if part.isdigit() else part
+                for part in re.split(r"(\d+)", os.path.basename(path))]
+
+    def run(self) -> dict:
+        """Play all jobs and return summaries by checkpoint."""
+        jobs = [(path, seed)
+                for path in self.checkpoints for seed in self.seeds]
+        episodes = {path: {} for path in self.checkpoints}
+        weights = {path: NumpyQNetwork.load_torch(path)
+                   for path in self.checkpoints}
+        chunk = max(1, len(jobs) // (self.workers * 8))
+        with mp.get_context("spawn").Pool(self.workers, init_worker,
+                                          (weights,)) as pool:
+            for path, seed, length, cause, steps in pool.imap_unordered(
+                    play_episode, jobs, chunksize=chunk):
+                episodes[path][seed] = (length, cause, steps)
+
+        for path in self.checkpoints:
+            played = [episodes[path][seed] for seed in self.seeds]
+            lengths = [length for length, _, _ in played]
+            summary = summarize(lengths, [cause for _, cause, _ in played])
+            summary["lengths"] = lengths
+            summary["steps"] = sum(steps for _, _, steps in played)
+            self.results[path] = summary
+        return self.results
+
+    def print_table(self) -> None:
+        """Print one row of statistics per checkpoint."""
+        header = (f"{'checkpoint':<16} {'mean':>16} {'median':>7} "
+                  f"{'p95':>7} {'max':>4}  "
+                  + " ".join(f"{cause:>10}" for cause in CAUSES))
+        print(header)
+        print("-" * len(header))
+        for path, summary in self.results.items():
+            low, high = summary["mean_ci"]
+            mean = f"{summary['mean']:.2f}±{(high - low) / 2:.2f}"
+            causes = " ".join(f"{summary['causes'][cause]['share']:>10.1%}"
+                              for cause in CAUSES)
+            print(f"{os.path.basename(path):<16} {mean:>16} "
+                  f"{summary['median']:>7.1f} {summary['p95']:>7.1f} "
+                  f"{summary['max']:>4}  {causes}")
+
+    def save(self, path: str) -> None:
+        """Write seeds and summaries to a JSON file."""
+        with open(path, "w") as file:
+            json.dump({"seeds": self.seeds, "results": self.results},
+                      file, indent=2)
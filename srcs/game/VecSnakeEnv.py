@@ -0,0 +1,282 @@
+import numpy as np
+from .GameConfig import GameConfig
+from .RayTable import RayTable
+from .Spawner import Spawner
+
+
+class VecSnakeEnv:
+    """Batch of Snake boards stepped in lockstep with NumPy.
+
+    Args:
+        `num_envs`: Number of boards simulated together
+        `seed`: Optional seed for the boards random generator
+        `config`: Board size, population and rewards, default
+            `GameConfig()`
+
+    Implementation:
+        Each board is a row of flat arrays indexed by cell `y * G + x`,
+        with one extra sentinel column (index `G*G`) that is always empty:
+        - body_count[N, G*G + 1]: number of snake segments on each cell
+        - fruits[N, G*G + 1]: 0 empty, 1 green fruit, 2 red fruit
+        - body[N, G*G + 1]: ring buffer of snake cells, head at `head_ptr`
+
+        Rewards and game over rules follow `SnakeEnv.reward`. Boards that
+        end during a step are reset automatically, their final observation
+        and length are returned in the step info.
+
+        Apart from resets, a step only touches the head, tail, eaten fruit
+        and ray cells of each board: fruits are drawn by rejection among
+        random cells, so its cost does not grow with the board area.
+    """
+    ACTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    GREEN = 1
+    RED = 2
+    SPAWN_TRIES = 8  # random draws before scanning crowded boards
+
+    def __init__(self,
+                 num_envs: int,
+                 seed: int | None = None,
+                 config: GameConfig | None = None):
+        self.config = config = config or GameConfig()
+        config.validate()
+
+        self.num_envs = num_envs
+        self.grid_size = config.grid_size
+        self.cells = config.cells
+        self.capacity = self.cells + 1
+        self.rng = np.random.default_rng(seed)
+
+        self.rows = np.arange(num_envs)
+        self.body_count = np.zeros((num_envs, self.cells + 1), dtype=np.int16)
+        self.fruits = np.zeros((num_envs, self.cells + 1), dtype=np.int8)
+        self.body = np.zeros((num_envs, self.capacity), dtype=np.int64)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.lengths = np.zeros(num_envs, dtype=np.int64)
+        self.head_y = np.zeros(num_envs, dtype=np.int64)
+        self.head_x = np.zeros(num_envs, dtype=np.int64)
+        self.step_no_food = np.zeros(num_envs, dtype=np.int64)
+
+        self.build_tables()
+
+    def build_tables(self) -> None:
+        """Get the wall distances and snake placements of the grid size.
+
+        Ray lengths and wall distances come from the `RayTable`,
+        placements from the `Spawner` table, both shared by every
+        environment of the same grid size. Ray cells are derived from the
+        heads at each step.
+        """
+        size = self.grid_size
+        table = RayTable.get(size)
+        self.ray_lengths, self.walls = table.lengths, table.walls
+        self.distances = np.arange(size) / size
+        # ray_offsets[direction, k]: offset of the cell k steps away
+        self.ray_offsets = (np.array([-size, size, -1, 1])[:, None]
+                            * np.arange(size))
+        Spawner.placement_table(self.config.snake_size, size)
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """Reset every board.
+
+        Args:
+            `seed`: Optional new seed for the boards random generator
+
+        Returns:
+            `np.ndarray`: Observations [num_envs, 20]
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.reset_boards(self.rows)
+        return self.get_states()
+
+    def reset_boards(self, rows: np.ndarray) -> None:
+        """Spawn a new snake and new fruits on the given boards."""
+        if rows.size == 0:
+            return
+        self.body_count[rows] = 0
+        self.fruits[rows] = 0
+        self.step_no_food[rows] = 0
+        self.spawn_snakes(rows)
+        for _ in range(self.config.green_fruits):
+            self.spawn_fruits(rows, self.GREEN)
+        for _ in range(self.config.red_fruits):
+            self.spawn_fruits(rows, self.RED)
+
+    def spawn_snakes(self, rows: np.ndarray) -> None:
+        """Place a straight snake of `snake_size` cells on each board.
+
+        Placements are drawn in bulk from the `Spawner` table, with the
+        same distribution as `Spawner.snake_spawn`.
+        """
+        snakes, _ = Spawner.snake_spawn_batch(self.config.snake_size,
+                                              self.grid_size,
+                                              rows.size,
+                                              self.rng)
+        segments = np.arange(self.config.snake_size)
+        head_y, head_x = snakes[:, 0, 0], snakes[:, 0, 1]
+        cells = snakes[:, :, 0] * self.grid_size + snakes[:, :, 1]
+
+        self.head_ptr[rows] = 0
+        self.lengths[rows] = self.config.snake_size
+        self.head_y[rows] = head_y
+        self.head_x[rows] = head_x
+        self.body[rows[:, None], segments] = cells
+        self.body_count[rows[:, None], cells] += 1
+
+    def spawn_fruits(self, rows: np.ndarray, kind: int) -> None:
+        """Place one fruit of `kind` on a random free cell of each board.
+
+        A random cell is drawn until it is free, which is uniform over
+        free cells. Boards still pending after `SPAWN_TRIES` draws are
+        mostly full and are scanned instead. Boards without any free
+        cell get no fruit, like `Spawner.fruit_spawn` returning None.
+        """
+        for _ in range(self.SPAWN_TRIES):
+            if rows.size == 0:
+                return
+            cells = self.rng.integers(self.cells, size=rows.size)
+            free = ((self.body_count[rows, cells] == 0)
+                    & (self.fruits[rows, cells] == 0))
+            self.fruits[rows[free], cells[free]] = kind
+            rows = rows[~free]
+        if rows.size == 0:
+            return
+        free = ((self.body_count[rows, :-1] == 0)
+                & (self.fruits[rows, :-1] == 0))
+        keys = self.rng.random(free.shape)
+        keys[~free] = -1
+        cells = keys.argmax(axis=1)
+        has_free = free.any(axis=1)
+        self.fruits[rows[has_free], cells[has_free]] = kind
+
+    def pop_tails(self, rows: np.ndarray) -> None:
+        """Remove the last segment of the snakes on the given boards."""
+        tails = self.body[rows, (self.head_ptr[rows] + self.lengths[rows] - 1)
+                          % self.capacity]
+        inside = tails >= 0
+        self.body_count[rows[inside], tails[inside]] -= 1
+        self.lengths[rows] -= 1
+
+    def step(self, actions: np.ndarray
+             ) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Move every snake one cell and resolve the step.
+
+        Args:
+            `actions`: Direction per board (0:TOP, 1:BOTTOM, 2:LEFT, 3:RIGHT)
+
+        Returns:
+            `tuple`: (states, rewards, dones, info) where:
+                - states [num_envs, 20] are observations after auto-reset
+                - rewards [num_envs] match `SnakeEnv.reward`
+                - dones [num_envs] flag boards whose episode ended
+                - info holds "final_states" and "lengths" of ended boards
+        """
+        size, rows = self.grid_size, self.rows
+        deltas = np.array(self.ACTIONS)[np.asarray(actions, dtype=np.int64)]
+        new_y = self.head_y + deltas[:, 0]
+        new_x = self.head_x + deltas[:, 1]
+        inside = (0 <= new_y) & (new_y < size) & (0 <= new_x) & (new_x < size)
+        cells = np.where(inside, new_y * size + new_x, self.cells)
+
+        # Tail is still in place, moving onto it is a collision
+        collision = ~inside | (self.body_count[rows, cells] > 0)
+        fruit = np.where(collision, 0, self.fruits[rows, cells])
+        green = fruit == self.GREEN
+        red = fruit == self.RED
+
+        # Insert new head
+        self.head_ptr = (self.head_ptr - 1) % self.capacity
+        self.body[rows, self.head_ptr] = np.where(inside, cells, -1)
+        self.body_count[rows[inside], cells[inside]] += 1
+        self.lengths += 1
+        self.head_y, self.head_x = new_y, new_x
+
+        config = self.config
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        rewards[collision] = config.r_collision
+        dones = collision.copy()
+
+        # Every snake except the ones eating green fruit loses its tail
+        self.pop_tails(np.flatnonzero(~green))
+
+        red_dead = red & (self.lengths <= 1)
+        red_ok = red & ~red_dead
+        rewards[red] = config.r_red_fruit
+        rewards[red_dead] = config.r_collision
+        dones |= red_dead
+        red_rows = np.flatnonzero(red_ok)
+        self.pop_tails(red_rows)
+        self.fruits[red_rows, cells[red_rows]] = 0
+        self.spawn_fruits(red_rows, self.RED)
+
+        green_rows = np.flatnonzero(green)
+        rewards[green] = config.r_green_fruit
+        self.fruits[green_rows, cells[green_rows]] = 0
+        self.spawn_fruits(green_rows, self.GREEN)
+        win = green & (self.lengths >= self.cells - config.red_fruits)
+        rewards[win] = config.r_win
+        dones |= win
+
+        fed = green | red
+        self.step_no_food[fed] = 0
+        self.step_no_food[~fed] += 1
+        dones |= self.step_no_food == self.cells
+
+        states = self.get_states()
+        done_rows = np.flatnonzero(dones)
+        info = {"final_states": states[done_rows],
+                "lengths": self.lengths[done_rows].copy()}
+        if done_rows.size:
+            self.reset_boards(done_rows)
+            states[done_rows] = self.get_states(done_rows)
+        return states, rewards, dones, info
+
+    def get_states(self, rows: np.ndarray | None = None) -> np.ndarray:
+        """Return observations as `Interpreter.get_state` would.
+
+        Args:
+            `rows`: Boards to observe, all boards if None
+
+        Returns:
+            `np.ndarray`: States [len(rows), 20] of float32, columns:
+            - [0-3]: Wall dist in directions [up,down,left,right]
+            - [4-7]: Green fruit dist in directions [up,down,left,right]
+            - [8-11]: Red fruit dist in directions [up,down,left,right]
+            - [12-15]: Body dist in directions [up,down,left,right]
+            - [16-19]: Collision flags [up,down,left,right] (0 or 1)
+        """
+        if rows is None:
+            rows = self.rows
+        size = self.grid_size
+        y, x = self.head_y[rows], self.head_x[rows]
+        inside = (0 <= y) & (y < size) & (0 <= x) & (x < size)
+        heads = np.where(inside, y * size + x, self.cells)
+        states = np.empty((rows.size, 20), dtype=np.float64)
+
+        states[:, 0:4] = self.walls[heads]
+
+        # rays[row, direction, k]: cell k steps away, sentinel if outside
+        rays = np.where(np.arange(size) < self.ray_lengths[heads][:, :, None],
+                        heads[:, None, None] + self.ray_offsets, self.cells)
+        fruits = self.fruits[rows[:, None, None], rays]
+        body = self.body_count[rows[:, None, None], rays]
+        body[:, :, 0] -= inside[:, None]  # the head is not part of snake[1:]
+        for col, found in ((4, fruits == self.GREEN),
+                           (8, fruits == self.RED),
+                           (12, body > 0)):
+            first = found.argmax(axis=2)
+            states[:, col:col + 4] = np.where(found.any(axis=2),
+                                              self.distances[first], 1)
+
+        # Each flag checks its own axis against walls, then the body
+        neighbors = (np.stack([y - 1, y + 1, y, y], axis=1),
+                     np.stack([x, x, x - 1, x + 1], axis=1))
+        near_wall = np.stack([y - 1 < 0, y + 1 >= size,
+                              x - 1 < 0, x + 1 >= size], axis=1)
+        near_inside = ((0 <= neighbors[0]) & (neighbors[0] < size)
+                       & (0 <= neighbors[1]) & (neighbors[1] < size))
+        near_cells = np.where(near_inside,
+                              neighbors[0] * size + neighbors[1], self.cells)
+        near_body = self.body_count[rows[:, None], near_cells] > 0
+        states[:, 16:20] = near_wall | near_body
+        return states.astype(np.float32)
@@ -0,0 +1,45 @@
+from srcs.game.Tournament import Tournament
+import argparse
+import glob
+import os
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Play checkpoints greedily on the same seeded boards.")
+    parser.add_argument("models",
+                        nargs="*", default=None,
+                        help="Model files to evaluate. Default model/*.pt.")
+    parser.add_argument("-s", "--seeds",
+                        type=int, default=200,
+                        help="Number of seeded boards per model.")
+    parser.add_argument("--first-seed",
+                        type=int, default=0,
+                        help="Seed of the first board.")
+    parser.add_argument("-w", "--workers",
+                        type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes.")
+    parser.add_argument("-o", "--output",
+                        type=str, default="tournament.json",
+                        help="JSON file to write results to.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    models = args.models or glob.glob(os.path.join("model", "*.pt"))
+    if not models:
+        raise SystemExit("No model to evaluate")
+    if args.seeds < 1 or args.workers < 1:
+        raise SystemExit("Seeds and workers must be > 0")
+
+    seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+    tournament = Tournament(models, seeds, args.workers)
+    tournament.run()
+    tournament.print_table()
+    tournament.save(args.output)
+    print(f"\nResults written to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()